@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark the SpeedConnect merge engine.
+
+Generates synthetic PDFs and merges them with each engine mode, showing
+that merge time follows the amount of content (pages and bytes) instead
+of a fixed per-file delay. Every input has its own text, so stream
+deduplication cannot collapse them and the output grows with the input;
+only the letterhead image shared by all inputs can be deduplicated. The
+old GUI loop slept 0.1 s per input; that overhead is printed next to
+each run for comparison. With --profile all, every output profile is
+measured so their size/time trade-offs can be compared side by side,
+with and without deduplication (--dedup).
+
+Usage:
+    python benchmark_merge.py
+    python benchmark_merge.py --files 100 1000 --pages 1 10 --mode streaming
+    python benchmark_merge.py --files 200 --pages 10 --profile all
+    python benchmark_merge.py --files 200 --pages 10 --profile all --dedup off
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+
+from pdf_merge_engine import (
+    DEFAULT_OUTPUT_PROFILE,
+    OUTPUT_PROFILES,
+    merge_pdfs_in_memory,
+    merge_pdfs_streaming,
+)
+
+MODES = {
+    "memory": merge_pdfs_in_memory,
+    "streaming": merge_pdfs_streaming,
+}
+LEGACY_DELAY_PER_FILE = 0.1  # time.sleep(0.1) removido de juntar_pdfs
+LOGO_SIZE = 64
+DEDUP_CHOICES = {"both": (True, False), "on": (True,), "off": (False,)}
+
+
+WORDS = ("contrato", "cliente", "fatura", "pagamento", "entrega", "relatorio", "valor", "prazo",
+         "servico", "pedido", "nota", "fiscal", "saldo", "conta", "periodo", "total")
+
+
+def create_sample_pdf(path, pages, doc_number=0, lines_per_page=40):
+    """Create a PDF whose pages carry a text content stream unique to doc_number."""
+    rng = random.Random(doc_number)
+    writer = PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    font_ref = writer._add_object(font)
+    # Logotipo do timbre: o mesmo em todos os arquivos, como nos documentos reais
+    logo = DecodedStreamObject()
+    logo.set_data(bytes((x * 4) % 256 for x in range(LOGO_SIZE)) * (LOGO_SIZE * 3))
+    logo.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Image"),
+        NameObject("/Width"): NumberObject(LOGO_SIZE),
+        NameObject("/Height"): NumberObject(LOGO_SIZE),
+        NameObject("/ColorSpace"): NameObject("/DeviceRGB"),
+        NameObject("/BitsPerComponent"): NumberObject(8),
+    })
+    logo_ref = writer._add_object(logo)
+
+    for page_number in range(pages):
+        page = writer.add_blank_page(595, 842)
+        commands = [b"q 48 0 0 48 507 774 cm /Logo Do Q", b"BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line in range(lines_per_page):
+            words = " ".join(rng.choice(WORDS) for _ in range(8))
+            text = f"Doc {doc_number} pag {page_number + 1} linha {line + 1}: {words} {rng.randrange(10 ** 9)}"
+            commands.append(f"({text}) '".encode())
+        commands.append(b"ET")
+        content = DecodedStreamObject()
+        content.set_data(b"\n".join(commands))
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font_ref}),
+            NameObject("/XObject"): DictionaryObject({NameObject("/Logo"): logo_ref}),
+        })
+
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def prepare_inputs(work_dir, files, pages):
+    """Create (or reuse) `files` distinct PDFs of `pages` pages each."""
+    input_dir = os.path.join(work_dir, f"docs_{files}x{pages}")
+    os.makedirs(input_dir, exist_ok=True)
+    inputs = []
+    for i in range(files):
+        path = os.path.join(input_dir, f"doc_{i:05d}.pdf")
+        if not os.path.exists(path):
+            create_sample_pdf(path, pages, doc_number=i)
+        inputs.append(path)
+    return inputs
+
+
+def run_benchmark(file_counts, page_counts, modes, work_dir, profiles=(DEFAULT_OUTPUT_PROFILE,),
+                  dedup_options=(True,)):
+    """Run every combination and print one table row per merge."""
+    header = f"{'modo':<10} {'perfil':<9} {'dedup':<5} {'arquivos':>8} {'págs/arq':>8} {'páginas':>8} " \
+             f"{'MB entrada':>10} {'MB saída':>9} {'tempo (s)':>10} {'ms/página':>10} " \
+             f"{'atraso antigo (s)':>18}"
+    print(header)
+    print("-" * len(header))
+
+    for pages in page_counts:
+        for files in file_counts:
+            inputs = prepare_inputs(work_dir, files, pages)
+            input_mb = sum(os.path.getsize(p) for p in inputs) / (1024 * 1024)
+            for mode in modes:
+                for profile in profiles:
+                    for deduplicate in dedup_options:
+                        output = os.path.join(work_dir, f"merged_{mode}_{profile}.pdf")
+                        start = time.perf_counter()
+                        stats = MODES[mode](inputs, output, profile=profile, deduplicate=deduplicate)
+                        elapsed = time.perf_counter() - start
+                        output_mb = stats['bytes_written'] / (1024 * 1024)
+                        dedup_text = "sim" if deduplicate else "não"
+                        print(f"{mode:<10} {profile:<9} {dedup_text:<5} {files:>8} {pages:>8} {stats['pages']:>8} "
+                              f"{input_mb:>10.1f} {output_mb:>9.2f} {elapsed:>10.2f} "
+                              f"{elapsed * 1000 / max(stats['pages'], 1):>10.2f} "
+                              f"{files * LEGACY_DELAY_PER_FILE:>18.1f}")
+                        os.remove(output)
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark do motor de junção de PDFs")
+    parser.add_argument("--files", type=int, nargs="+", default=[50, 200],
+                        help="Quantidades de arquivos de entrada")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10],
+                        help="Páginas por arquivo de entrada")
+    parser.add_argument("--mode", choices=["both"] + sorted(MODES), default="both",
+                        help="Modo do motor a medir")
+    parser.add_argument("--profile", choices=["all"] + list(OUTPUT_PROFILES),
+                        default=DEFAULT_OUTPUT_PROFILE, help="Perfil de saída a medir")
+    parser.add_argument("--dedup", choices=list(DEDUP_CHOICES), default="both",
+                        help="Medir com deduplicação, sem ela ou as duas (padrão: both)")
+    parser.add_argument("--work-dir", help="Pasta para os PDFs gerados (padrão: temporária)")
+    args = parser.parse_args()
+
+    modes = sorted(MODES) if args.mode == "both" else [args.mode]
+    profiles = list(OUTPUT_PROFILES) if args.profile == "all" else [args.profile]
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        run_benchmark(args.files, args.pages, modes, args.work_dir, profiles, DEDUP_CHOICES[args.dedup])
+    else:
+        with tempfile.TemporaryDirectory(prefix="speedconnect_bench_") as work_dir:
+            run_benchmark(args.files, args.pages, modes, work_dir, profiles, DEDUP_CHOICES[args.dedup])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark flat versus tree (hierarchical) merges.
+
+Generates many small PDFs and merges them with a single writer (flat,
+streaming and in-memory) and with merge_pdfs_tree at one or more chunk
+sizes. Each run happens in a fresh process, so the peak memory column
+belongs to that run alone (tree workers are not included).
+
+Usage:
+    python benchmark_tree_merge.py
+    python benchmark_tree_merge.py --files 1000 10000 50000 --chunk-size 100 250 1000
+    python benchmark_tree_merge.py --files 10000 --strategy streaming tree
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmark_merge import prepare_inputs
+from pdf_merge_engine import merge_pdfs_in_memory, merge_pdfs_streaming
+from pdf_tree_merge import DEFAULT_TREE_CHUNK_SIZE, merge_pdfs_tree
+
+STRATEGIES = ["memory", "streaming", "tree"]
+
+
+def _run_once(strategy, inputs, output, chunk_size, workers, connection):
+    """Run one merge in this (child) process and send back its figures."""
+    start = time.perf_counter()
+    if strategy == "tree":
+        stats = merge_pdfs_tree(inputs, output, chunk_size=chunk_size, workers=workers)
+    elif strategy == "memory":
+        stats = merge_pdfs_in_memory(inputs, output)
+    else:
+        stats = merge_pdfs_streaming(inputs, output)
+    elapsed = time.perf_counter() - start
+    connection.send((elapsed, stats["pages"], stats["bytes_written"], stats["peak_memory_mb"]))
+    connection.close()
+
+
+def measure(strategy, inputs, output, chunk_size=None, workers=None):
+    """Run one merge in a fresh process; returns (seconds, pages, bytes, peak MB)."""
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_run_once,
+                                      args=(strategy, inputs, output, chunk_size, workers, sender))
+    process.start()
+    sender.close()
+    result = receiver.recv()
+    process.join()
+    os.remove(output)
+    return result
+
+
+def run_benchmark(file_counts, strategies, chunk_sizes, workers, work_dir):
+    """Run every combination and print one table row per merge."""
+    header = f"{'estratégia':<16} {'arquivos':>8} {'tempo (s)':>10} {'arq/s':>9} " \
+             f"{'ms/arquivo':>10} {'MB saída':>9} {'pico MB':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for files in file_counts:
+        inputs = prepare_inputs(work_dir, files, 1)
+        output = os.path.join(work_dir, "merged.pdf")
+        runs = []
+        for strategy in strategies:
+            if strategy == "tree":
+                runs.extend((f"tree (K={k})", "tree", k) for k in chunk_sizes)
+            else:
+                runs.append((f"flat {strategy}", strategy, None))
+
+        for label, strategy, chunk_size in runs:
+            seconds, pages, size, peak = measure(strategy, inputs, output, chunk_size, workers)
+            peak_text = f"{peak:.0f}" if peak is not None else "-"
+            print(f"{label:<16} {files:>8} {seconds:>10.2f} {files / seconds:>9.0f} "
+                  f"{seconds * 1000 / files:>10.3f} {size / (1024 * 1024):>9.2f} {peak_text:>8}",
+                  flush=True)
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark da junção plana versus em árvore")
+    parser.add_argument("--files", type=int, nargs="+", default=[1000, 10000, 50000],
+                        help="Quantidades de arquivos de entrada (1 página cada)")
+    parser.add_argument("--strategy", choices=STRATEGIES, nargs="+", default=STRATEGIES,
+                        help="Estratégias a medir")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[DEFAULT_TREE_CHUNK_SIZE],
+                        help="Tamanhos de parte da junção em árvore")
+    parser.add_argument("--workers", type=int, help="Processos por nível da árvore (padrão: nº de núcleos)")
+    parser.add_argument("--work-dir", help="Pasta para os PDFs gerados (padrão: temporária)")
+    args = parser.parse_args()
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        run_benchmark(args.files, args.strategy, args.chunk_size, args.workers, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory(prefix="speedconnect_tree_bench_") as work_dir:
+            run_benchmark(args.files, args.strategy, args.chunk_size, args.workers, work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+PDF Batch Merge
+===============
+Run many independent merges of the SpeedConnect engine in parallel.
+
+A manifest lists the jobs (inputs and output name). Each job runs in its
+own worker process, at most `workers` at a time, so a job that exceeds
+its timeout can be terminated without affecting the others.
+
+Manifest formats:
+
+    JSON: [{"output": "clienteA.pdf", "inputs": ["a1.pdf", "a2.pdf"]},
+           {"output": "clienteB.pdf", "input_dir": "clienteB", "recursive": false}]
+          (a top-level {"jobs": [...]} object is also accepted)
+
+    CSV:  output,input
+          clienteA.pdf,a1.pdf
+          clienteA.pdf,a2.pdf
+
+Relative paths are resolved against the manifest's folder.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import time
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Optional
+
+from pdf_merge_engine import (
+    DEFAULT_OUTPUT_PROFILE,
+    PDFMergeError,
+    find_pdf_files,
+    merge_pdfs_in_memory,
+    merge_pdfs_streaming,
+    remove_partial_outputs,
+)
+
+MERGE_FUNCTIONS = {
+    "memory": merge_pdfs_in_memory,
+    "streaming": merge_pdfs_streaming,
+}
+
+Job = Dict[str, object]
+JobResult = Dict[str, object]
+
+
+class ManifestError(Exception):
+    """Raised when a batch manifest cannot be read."""
+
+
+def load_manifest(manifest_path: str) -> List[Job]:
+    """
+    Load merge jobs from a JSON or CSV manifest.
+
+    Args:
+        manifest_path: Path to a .json or .csv manifest
+
+    Returns:
+        List of jobs, each a dict with absolute 'output' and 'inputs'
+
+    Raises:
+        ManifestError: If the manifest is malformed
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    def resolve(path: str) -> str:
+        return os.path.normpath(os.path.join(base_dir, os.path.expanduser(path)))
+
+    try:
+        if manifest_path.lower().endswith(".csv"):
+            jobs_by_output: Dict[str, Job] = {}
+            with open(manifest_path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    output = resolve(row["output"])
+                    job = jobs_by_output.setdefault(output, {"output": output, "inputs": []})
+                    job["inputs"].append(resolve(row["input"]))
+            jobs = list(jobs_by_output.values())
+        else:
+            with open(manifest_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("jobs", [])
+            jobs = []
+            for entry in data:
+                inputs = [resolve(p) for p in entry.get("inputs", [])]
+                if entry.get("input_dir"):
+                    inputs.extend(find_pdf_files(resolve(entry["input_dir"]), bool(entry.get("recursive"))))
+                jobs.append({"output": resolve(entry["output"]), "inputs": inputs})
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ManifestError(f"Manifesto inválido '{manifest_path}': {e}") from e
+
+    return jobs
+
+
+def _job_worker(job: Job, mode: str, profile: str, image_dpi: Optional[int], fsync: bool,
+                skip_errors: bool, connection) -> None:
+    """Merge one job inside a worker process and send back its result."""
+    start = time.perf_counter()
+    result: JobResult = {"status": "ok", "error": ""}
+    try:
+        image_optimizer = None
+        if image_dpi:
+            from pdf_image_optimizer import ImageOptimizer
+            # Processos daemon não podem criar filhos; o lote já é paralelo por job
+            image_optimizer = ImageOptimizer(target_dpi=image_dpi, workers=0)
+        stats = MERGE_FUNCTIONS[mode](job["inputs"], job["output"], profile=profile,
+                                      image_optimizer=image_optimizer, fsync=fsync,
+                                      skip_errors=skip_errors)
+        result.update(stats)
+    except PDFMergeError as e:
+        result.update({"status": "error", "error": f"{os.path.basename(e.pdf_path)}: {e}",
+                       "skipped": e.skipped})
+    except Exception as e:
+        result.update({"status": "error", "error": str(e)})
+    result["seconds"] = time.perf_counter() - start
+    connection.send(result)
+    connection.close()
+
+
+def _finalize_result(job: Job, result: JobResult) -> JobResult:
+    """Add job identity and throughput figures to a raw worker result."""
+    skipped = result.get("skipped") or []
+    # Vazão e contagem só dos PDFs realmente juntados; os ignorados vão em 'skipped'
+    skipped_paths = {entry["path"] for entry in skipped}
+    bytes_in = 0
+    for path in job["inputs"]:
+        if path in skipped_paths:
+            continue
+        try:
+            bytes_in += os.path.getsize(path)
+        except OSError:
+            pass
+
+    seconds = result.get("seconds") or 0.0
+    pages = result.get("pages") or 0
+    final = {
+        "output": job["output"],
+        "status": result.get("status", "error"),
+        "error": result.get("error", ""),
+        "files": result.get("files") or 0,
+        "pages": pages,
+        "bytes_in": bytes_in,
+        "bytes_written": result.get("bytes_written") or 0,
+        "dedup_bytes_saved": result.get("dedup_bytes_saved") or 0,
+        "skipped": skipped,
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(pages / seconds, 1) if seconds > 0 else 0.0,
+        "mb_per_sec": round(bytes_in / (1024 * 1024) / seconds, 2) if seconds > 0 else 0.0,
+    }
+    return final
+
+
+def run_batch(
+    jobs: List[Job],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    mode: str = "streaming",
+    profile: str = DEFAULT_OUTPUT_PROFILE,
+    image_dpi: Optional[int] = None,
+    fsync: bool = False,
+    skip_errors: bool = False,
+    progress_callback: Optional[Callable[[int, int, JobResult], None]] = None,
+) -> List[JobResult]:
+    """
+    Run merge jobs across a pool of worker processes.
+
+    Args:
+        jobs: Jobs from load_manifest()
+        workers: Maximum concurrent processes (default: number of cores)
+        timeout: Per-job time limit in seconds; late jobs are terminated
+        mode: Engine mode, 'streaming' or 'memory'
+        profile: Output profile name from OUTPUT_PROFILES
+        image_dpi: Downsample images above this DPI (None disables)
+        fsync: Flush each output to disk before it is renamed into place
+        skip_errors: Skip unreadable inputs instead of failing the whole job
+        progress_callback: Optional callable(done, total, result) per finished job
+
+    Returns:
+        One result dict per job, in manifest order
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    waiting = list(range(len(jobs)))
+    running = {}  # índice -> (processo, conexão, início)
+    done = 0
+
+    def finish(index: int, raw: JobResult) -> None:
+        nonlocal done
+        results[index] = _finalize_result(jobs[index], raw)
+        done += 1
+        if progress_callback:
+            progress_callback(done, len(jobs), results[index])
+
+    while waiting or running:
+        while waiting and len(running) < workers:
+            index = waiting.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_job_worker, args=(jobs[index], mode, profile, image_dpi, fsync, skip_errors, sender),
+                daemon=True
+            )
+            process.start()
+            sender.close()
+            running[index] = (process, receiver, time.monotonic())
+
+        # Acordar também com o resultado: o filho só termina depois que o send() é lido
+        # (um resultado maior que o buffer do pipe bloquearia o filho para sempre)
+        wait([process.sentinel for process, _, _ in running.values()]
+             + [receiver for _, receiver, _ in running.values()], timeout=0.5)
+
+        now = time.monotonic()
+        for index, (process, receiver, started) in list(running.items()):
+            if receiver.poll():
+                try:
+                    raw = receiver.recv()
+                except EOFError:
+                    raw = None  # Processo terminou sem enviar resultado
+                process.join()
+                if raw is None:
+                    raw = {"status": "error", "error": f"processo terminou com código {process.exitcode}"}
+            elif not process.is_alive():
+                process.join()
+                raw = {"status": "error", "error": f"processo terminou com código {process.exitcode}"}
+            elif timeout is not None and now - started > timeout:
+                process.terminate()
+                process.join()
+                # O processo morto não removeu seu arquivo temporário; a saída
+                # anterior, se houver, continua intacta
+                remove_partial_outputs(jobs[index]["output"])
+                raw = {"status": "timeout", "error": f"tempo limite de {timeout:g}s excedido",
+                       "seconds": now - started}
+            else:
+                continue
+            receiver.close()
+            del running[index]
+            finish(index, raw)
+
+    return results
+
+
+def summarize(results: List[JobResult], wall_seconds: float) -> Dict[str, object]:
+    """
+    Aggregate batch results into a summary report.
+
+    Args:
+        results: Results returned by run_batch()
+        wall_seconds: Elapsed wall-clock time of the whole batch
+
+    Returns:
+        Dict with counts per status, totals and overall throughput
+    """
+    pages = sum(r["pages"] for r in results)
+    bytes_in = sum(r["bytes_in"] for r in results)
+    return {
+        "jobs": len(results),
+        "ok": sum(1 for r in results if r["status"] == "ok"),
+        "errors": sum(1 for r in results if r["status"] == "error"),
+        "timeouts": sum(1 for r in results if r["status"] == "timeout"),
+        "files": sum(r["files"] for r in results),
+        "skipped_files": sum(len(r["skipped"]) for r in results),
+        "pages": pages,
+        "bytes_in": bytes_in,
+        "wall_seconds": round(wall_seconds, 3),
+        "pages_per_sec": round(pages / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        "mb_per_sec": round(bytes_in / (1024 * 1024) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "results": results,
+    }
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+PDF Checkpointed Merge
+======================
+Resumable merge mode for very large batches.
+
+The inputs are merged in chunks of `chunk_size` files. Each chunk is
+written to an intermediate PDF in a checkpoint folder, and a small JSON
+state file records which chunks are complete and which input versions
+(path, size, mtime) they were built from. The final output is a merge of
+the intermediates.
+
+If the run fails, is cancelled or the machine goes down, running the same
+merge again reuses every completed chunk whose inputs did not change, so
+a failure on file 1,800 of 2,000 only costs the chunk it happened in.
+The chunks and state file are removed once the final output is in place,
+and the folder too if nothing else is left in it.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from pdf_merge_engine import (
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_PARSE_WORKERS,
+    PageRanges,
+    PDFMergeError,
+    ProgressCallback,
+    atomic_output,
+    empty_merge_error,
+    get_peak_memory_mb,
+    merge_pdfs_streaming,
+)
+
+DEFAULT_CHUNK_SIZE = 200
+STATE_FILE = "checkpoint.json"
+STATE_VERSION = 1
+
+# Os intermediários são cópias diretas; a compressão do perfil é aplicada na saída final
+CHUNK_PROFILE = "fast"
+
+
+def default_checkpoint_dir(output_path: str) -> str:
+    """Checkpoint folder used when none is given: <output>.checkpoint next to the output."""
+    return os.path.abspath(output_path) + ".checkpoint"
+
+
+def _input_signature(pdf_path: str, page_range: Optional[str] = None,
+                     skip_errors: bool = False) -> Optional[List[object]]:
+    """
+    [path, size, mtime_ns(, page range)] of an input.
+
+    A missing input has a null signature with skip_errors (the chunk merge
+    then reports it as skipped, and the chunk is rebuilt once the file
+    exists); otherwise it raises PDFMergeError.
+    """
+    try:
+        st = os.stat(pdf_path)
+    except OSError as e:
+        if skip_errors:
+            return None
+        raise PDFMergeError(pdf_path, e) from e
+    signature = [os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns]
+    if page_range:
+        signature.append(page_range)
+    return signature
+
+
+def _load_state(state_path: str, settings: Dict[str, object]) -> Dict[str, object]:
+    """Load the checkpoint state, or start a new one if it is missing or for other settings."""
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION and state.get("settings") == settings:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "settings": settings, "chunks": {}}
+
+
+def _save_state(state_path: str, state: Dict[str, object]) -> None:
+    # Gravação atômica: uma queda no meio não corrompe o checkpoint anterior
+    with atomic_output(state_path, fsync=True) as f:
+        f.write(json.dumps(state, ensure_ascii=False, indent=1).encode('utf-8'))
+
+
+def _remove_checkpoint(checkpoint_dir: str, state: Dict[str, object]) -> None:
+    """Delete the chunks and state file of a finished merge, and the folder if nothing else is in it."""
+    # A pasta pode ter sido indicada pelo usuário: apagar só o que o checkpoint gravou
+    for name in list(state["chunks"]) + [STATE_FILE]:
+        try:
+            os.remove(os.path.join(checkpoint_dir, name))
+        except FileNotFoundError:
+            pass
+    try:
+        os.rmdir(checkpoint_dir)
+    except OSError:
+        pass  # Ainda há outros arquivos na pasta
+
+
+def merge_pdfs_checkpointed(
+    pdf_paths: List[str],
+    output_path: str,
+    progress_callback: Optional[ProgressCallback] = None,
+    checkpoint_dir: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    deduplicate: bool = True,
+    profile: str = DEFAULT_OUTPUT_PROFILE,
+    image_optimizer=None,
+    cancel_event: Optional[threading.Event] = None,
+    fsync: bool = False,
+    skip_errors: bool = False,
+    page_ranges: Optional[PageRanges] = None,
+) -> Dict[str, object]:
+    """
+    Merge PDFs through resumable per-chunk intermediates.
+
+    Args:
+        pdf_paths: Ordered list of input PDF paths
+        output_path: Path of the merged PDF
+        progress_callback: Optional callable(current, total, message, pages_done, bytes_read)
+        checkpoint_dir: Folder for intermediates and state
+            (default: default_checkpoint_dir(output_path))
+        chunk_size: Inputs per intermediate; smaller chunks lose less work
+            on failure but add a little overhead to the final pass
+        parse_workers: Threads parsing upcoming inputs (0 disables the pipeline)
+        deduplicate: Write identical streams only once in the final output
+        profile: Output profile of the final output
+        image_optimizer: Optional ImageOptimizer applied while building chunks
+        cancel_event: Optional threading.Event; completed chunks are kept
+        fsync: Flush the final output to disk before it replaces output_path
+        skip_errors: Skip unreadable inputs; the skips of reused chunks are
+            remembered in the checkpoint and reported again
+        page_ranges: Optional {pdf_path: range} such as "1-3,7,10-"; a chunk
+            is rebuilt when the range of one of its inputs changes
+
+    Returns:
+        Dict with the merge_pdfs_streaming statistics of the final pass, plus
+        chunks, chunks_reused, files (original inputs merged) and skipped
+
+    Raises:
+        PDFMergeError: If an input is missing or cannot be read (earlier
+            chunks are kept)
+        MergeCancelled: If cancel_event is set (completed chunks are kept)
+        OSError: If the checkpoint cannot be written
+    """
+    chunk_size = max(1, chunk_size)
+    checkpoint_dir = checkpoint_dir or default_checkpoint_dir(output_path)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    state_path = os.path.join(checkpoint_dir, STATE_FILE)
+
+    # Configurações que mudam o conteúdo dos intermediários invalidam o checkpoint
+    settings = {
+        "chunk_size": chunk_size,
+        "deduplicate": deduplicate,
+        "skip_errors": skip_errors,
+        "image_dpi": image_optimizer.target_dpi if image_optimizer else None,
+        "jpeg_quality": image_optimizer.jpeg_quality if image_optimizer else None,
+    }
+    state = _load_state(state_path, settings)
+
+    total = len(pdf_paths)
+    page_ranges = page_ranges or {}
+    chunk_paths = []
+    chunks_reused = 0
+    skipped = []
+    images_saved_before = image_optimizer.bytes_saved if image_optimizer else 0
+    for start in range(0, total, chunk_size):
+        chunk_inputs = pdf_paths[start:start + chunk_size]
+        chunk_name = f"chunk_{start // chunk_size + 1:05d}.pdf"
+        chunk_path = os.path.join(checkpoint_dir, chunk_name)
+
+        signatures = [_input_signature(path, page_ranges.get(path), skip_errors) for path in chunk_inputs]
+        completed = state["chunks"].get(chunk_name)
+        if completed and completed["inputs"] == signatures and (completed["empty"] or os.path.exists(chunk_path)):
+            chunks_reused += 1
+            skipped.extend(completed["skipped"])
+            if not completed["empty"]:
+                chunk_paths.append(chunk_path)
+            continue
+
+        def chunk_progress(current, _total, message, pages_done, bytes_read, offset=start):
+            if progress_callback:
+                progress_callback(offset + current, total, message, pages_done, bytes_read)
+
+        try:
+            chunk_stats = merge_pdfs_streaming(chunk_inputs, chunk_path, progress_callback=chunk_progress,
+                                               parse_workers=parse_workers, deduplicate=deduplicate,
+                                               profile=CHUNK_PROFILE, image_optimizer=image_optimizer,
+                                               cancel_event=cancel_event, fsync=True,
+                                               skip_errors=skip_errors, page_ranges=page_ranges)
+            chunk_skipped, empty = chunk_stats["skipped"], False
+            chunk_paths.append(chunk_path)
+        except PDFMergeError as e:
+            if not e.skipped:
+                raise
+            chunk_skipped, empty = e.skipped, True  # Nenhum PDF da parte pôde ser lido
+        skipped.extend(chunk_skipped)
+        state["chunks"][chunk_name] = {"inputs": signatures, "skipped": chunk_skipped, "empty": empty}
+        _save_state(state_path, state)
+
+    if not chunk_paths and skipped:
+        raise empty_merge_error(skipped)
+
+    def final_progress(current, _total, message, pages_done, bytes_read):
+        if progress_callback:
+            progress_callback(total, total, message or "Juntando partes...", pages_done, bytes_read)
+
+    # As partes não passam de novo pelo otimizador: as imagens já foram reduzidas
+    stats = merge_pdfs_streaming(chunk_paths, output_path, progress_callback=final_progress,
+                                 parse_workers=parse_workers, deduplicate=deduplicate,
+                                 profile=profile, cancel_event=cancel_event, fsync=fsync)
+
+    _remove_checkpoint(checkpoint_dir, state)
+
+    stats.update({
+        "files": total - len(skipped),
+        "skipped": skipped,
+        "chunks": len(chunk_paths),
+        "chunks_reused": chunks_reused,
+        "image_bytes_saved": (image_optimizer.bytes_saved - images_saved_before) if image_optimizer else 0,
+        "peak_memory_mb": get_peak_memory_mb(),
+    })
+    return stats
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+PDF Merger Command Line
+=======================
+Headless entry point for the SpeedConnect merge engine.
+
+Imports no GUI modules, so it starts fast and runs on build servers:
+
+    python -m pdf_merger_cli merge --input-dir ./relatorios --output merged.pdf
+    python -m pdf_merger_cli merge --output merged.pdf capa.pdf corpo.pdf
+    python -m pdf_merger_cli merge --input-dir ./relatorios --output lote.pdf --split-size 100
+    python -m pdf_merger_cli merge --input-dir ./relatorios --output capas.pdf --pages 1
+    python -m pdf_merger_cli batch manifesto.json --workers 4 --timeout 600
+    python -m pdf_merger_cli watch ./scanner --output-dir ./juntados
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+from pdf_batch import MERGE_FUNCTIONS, ManifestError, load_manifest, run_batch, summarize
+from pdf_merge_engine import (
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_PARSE_WORKERS,
+    OUTPUT_PROFILES,
+    PDFMergeError,
+    find_pdf_files,
+    find_split_parts,
+    merge_pdfs_split,
+    parse_page_ranges,
+)
+
+EXIT_OK = 0
+EXIT_MERGE_ERROR = 1
+EXIT_USAGE_ERROR = 2
+EXIT_SKIPPED_FILES = 3
+EXIT_CANCELLED = 130
+
+
+def collect_inputs(args: argparse.Namespace) -> List[str]:
+    """
+    Build the ordered input list from --input-dir and positional files.
+
+    Raises:
+        NotADirectoryError: If --input-dir is not a directory
+    """
+    inputs = []
+    if args.input_dir:
+        inputs.extend(find_pdf_files(args.input_dir, args.recursive, workers=args.scan_workers,
+                                     max_depth=args.max_depth, max_files=args.max_files))
+    inputs.extend(args.files)
+    return inputs
+
+
+def write_skip_report(path: str, output: str, skipped: List[dict]) -> None:
+    """Save the skipped inputs of a merge as JSON."""
+    report = {"output": output, "skipped_count": len(skipped), "skipped": skipped}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def command_merge(args: argparse.Namespace) -> int:
+    """Run the merge subcommand."""
+    try:
+        inputs = collect_inputs(args)
+    except OSError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    if not inputs:
+        print("Erro: nenhum PDF para juntar.", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    split = bool(args.split_size or args.split_pages)
+    if sum((args.checkpoint, args.tree, split)) > 1:
+        print("Erro: use apenas um de --checkpoint, --tree e --split-size/--split-pages.", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    page_ranges = None
+    if args.pages:
+        try:
+            parse_page_ranges(args.pages, 0)  # Só a sintaxe; o nº de páginas varia por arquivo
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return EXIT_USAGE_ERROR
+        page_ranges = {path: args.pages for path in inputs}
+
+    output = os.path.abspath(args.output)
+    # Com divisão, qualquer parte existente seria substituída ou apagada
+    existing = sorted(find_split_parts(output).values()) if split else [output]
+    existing = [path for path in existing if os.path.exists(path)]
+    if existing and not args.overwrite:
+        print(f"Erro: '{existing[0]}' já existe (use --overwrite para substituir).", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    image_optimizer = None
+    if args.image_dpi:
+        # Pillow só é carregado quando a otimização de imagens é pedida
+        from pdf_image_optimizer import ImageOptimizer
+        image_optimizer = ImageOptimizer(target_dpi=args.image_dpi, jpeg_quality=args.jpeg_quality)
+
+    try:
+        if args.checkpoint:
+            from pdf_checkpoint import DEFAULT_CHUNK_SIZE, merge_pdfs_checkpointed
+            stats = merge_pdfs_checkpointed(inputs, output, checkpoint_dir=args.checkpoint_dir,
+                                            chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE,
+                                            parse_workers=args.parse_workers,
+                                            deduplicate=not args.no_dedup, profile=args.profile,
+                                            image_optimizer=image_optimizer, fsync=args.fsync,
+                                            skip_errors=args.skip_errors, page_ranges=page_ranges)
+        elif args.tree:
+            from pdf_tree_merge import DEFAULT_TREE_CHUNK_SIZE, merge_pdfs_tree
+            stats = merge_pdfs_tree(inputs, output, chunk_size=args.chunk_size or DEFAULT_TREE_CHUNK_SIZE,
+                                    workers=args.tree_workers, parse_workers=args.parse_workers,
+                                    deduplicate=not args.no_dedup, profile=args.profile,
+                                    image_optimizer=image_optimizer, fsync=args.fsync,
+                                    skip_errors=args.skip_errors, page_ranges=page_ranges)
+        elif split:
+            stats = merge_pdfs_split(inputs, output,
+                                     max_bytes=int(args.split_size * 1024 * 1024) if args.split_size else None,
+                                     max_pages=args.split_pages, parse_workers=args.parse_workers,
+                                     deduplicate=not args.no_dedup, profile=args.profile,
+                                     image_optimizer=image_optimizer, fsync=args.fsync,
+                                     skip_errors=args.skip_errors, page_ranges=page_ranges)
+        else:
+            stats = MERGE_FUNCTIONS[args.mode](inputs, output, parse_workers=args.parse_workers,
+                                               deduplicate=not args.no_dedup, profile=args.profile,
+                                               image_optimizer=image_optimizer, fsync=args.fsync,
+                                               skip_errors=args.skip_errors, page_ranges=page_ranges)
+    except PDFMergeError as e:
+        print(f"Erro ao processar '{e.pdf_path}': {e}", file=sys.stderr)
+        if args.skip_report and e.skipped:
+            write_skip_report(args.skip_report, output, e.skipped)
+        if args.checkpoint:
+            print("As partes concluídas foram mantidas; rode o mesmo comando para continuar.",
+                  file=sys.stderr)
+        return EXIT_MERGE_ERROR
+    except KeyboardInterrupt:
+        # O motor remove o arquivo temporário antes de propagar a interrupção
+        print("Junção cancelada.", file=sys.stderr)
+        return EXIT_CANCELLED
+    finally:
+        if image_optimizer is not None:
+            image_optimizer.close()
+
+    stats["output"] = output
+    if args.skip_report:
+        write_skip_report(args.skip_report, output, stats["skipped"])
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False))
+    elif not args.quiet:
+        if split:
+            print(f"✅ {stats['files']} PDFs unidos ({stats['pages']} páginas) em {len(stats['parts'])} partes:")
+            for part in stats["parts"]:
+                print(f"   {part['path']} ({part['pages']} páginas, {part['bytes'] / (1024 * 1024):.1f} MB)")
+        else:
+            print(f"✅ {stats['files']} PDFs unidos ({stats['pages']} páginas) em {output}")
+        if stats.get("chunks_reused"):
+            print(f"⏩ {stats['chunks_reused']} de {stats['chunks']} partes reaproveitadas do checkpoint")
+        if stats["dedup_objects"]:
+            print(f"♻️  {stats['dedup_objects']} recursos duplicados gravados uma única vez "
+                  f"({stats['dedup_bytes_saved'] / (1024 * 1024):.1f} MB economizados)")
+        if stats["image_bytes_saved"]:
+            print(f"🖼️  Imagens reduzidas para {args.image_dpi} dpi "
+                  f"({stats['image_bytes_saved'] / (1024 * 1024):.1f} MB economizados)")
+        if stats["skipped"]:
+            print(f"⚠️  {len(stats['skipped'])} PDFs ignorados:")
+            for entry in stats["skipped"]:
+                print(f"   {entry['path']}: {entry['reason']}")
+    return EXIT_SKIPPED_FILES if stats["skipped"] else EXIT_OK
+
+
+def print_batch_report(summary: dict) -> None:
+    """Print one throughput row per job followed by the batch totals."""
+    header = f"{'status':<8} {'arquivos':>8} {'ignorados':>9} {'páginas':>8} {'tempo (s)':>10} " \
+             f"{'pág/s':>9} {'MB/s':>8}  saída"
+    print(header)
+    print("-" * len(header))
+    for r in summary["results"]:
+        print(f"{r['status']:<8} {r['files']:>8} {len(r['skipped']):>9} {r['pages']:>8} {r['seconds']:>10.2f} "
+              f"{r['pages_per_sec']:>9.1f} {r['mb_per_sec']:>8.2f}  {r['output']}")
+        if r["error"]:
+            print(f"{'':<8} ↳ {r['error']}")
+        for entry in r["skipped"]:
+            print(f"{'':<8} ↳ ignorado {entry['path']}: {entry['reason']}")
+    print("-" * len(header))
+    print(f"{summary['ok']}/{summary['jobs']} jobs OK, {summary['errors']} com erro, "
+          f"{summary['timeouts']} por tempo limite, {summary['files']} PDFs unidos, "
+          f"{summary['skipped_files']} ignorados - "
+          f"{summary['pages']} páginas em "
+          f"{summary['wall_seconds']:.2f}s ({summary['pages_per_sec']:.1f} pág/s, "
+          f"{summary['mb_per_sec']:.2f} MB/s)")
+
+
+def command_batch(args: argparse.Namespace) -> int:
+    """Run the batch subcommand."""
+    if args.workers is not None and args.workers < 1:
+        print("Erro: --workers deve ser pelo menos 1.", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except ManifestError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    if not jobs:
+        print("Erro: manifesto sem jobs.", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    def report_job(done: int, total: int, result: dict) -> None:
+        if not args.quiet and not args.json:
+            print(f"[{done}/{total}] {result['status']}: {result['output']}", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = run_batch(jobs, workers=args.workers, timeout=args.timeout,
+                        mode=args.mode, profile=args.profile, image_dpi=args.image_dpi,
+                        fsync=args.fsync, skip_errors=args.skip_errors,
+                        progress_callback=report_job)
+    summary = summarize(results, time.perf_counter() - start)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False))
+    elif not args.quiet:
+        print_batch_report(summary)
+
+    if summary["ok"] != summary["jobs"]:
+        return EXIT_MERGE_ERROR
+    return EXIT_SKIPPED_FILES if summary["skipped_files"] else EXIT_OK
+
+
+def command_watch(args: argparse.Namespace) -> int:
+    """Run the watch subcommand until interrupted."""
+    from pdf_watcher import FolderWatcher
+
+    if not os.path.isdir(args.folder):
+        print(f"Erro: '{args.folder}' não é uma pasta.", file=sys.stderr)
+        return EXIT_USAGE_ERROR
+
+    output_dir = args.output_dir or args.folder
+    state_path = args.state or os.path.join(output_dir, ".pdf_watch_state.sqlite3")
+
+    def report(event: str, data) -> None:
+        if args.json:
+            print(json.dumps({"event": event, "data": data}, ensure_ascii=False), flush=True)
+        elif args.quiet:
+            return
+        elif event == "merged":
+            print(f"✅ {data['files']} PDFs unidos ({data['pages']} páginas) em {data['output']}", flush=True)
+        elif event == "pending" and data:
+            print(f"⏳ {data} PDFs novos aguardando estabilizar...", flush=True)
+        elif event == "error":
+            print(f"⚠️  {data}", file=sys.stderr, flush=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    watcher = FolderWatcher(args.folder, output_dir, state_path,
+                            settle_seconds=args.settle, poll_interval=args.poll_interval,
+                            mode=args.mode, profile=args.profile, output_prefix=args.prefix,
+                            use_inotify=not args.poll, fsync=args.fsync, callback=report)
+    if not args.quiet and not args.json:
+        print(f"👀 Monitorando {os.path.abspath(args.folder)} (Ctrl+C para sair)", flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return EXIT_OK
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser with all subcommands."""
+    parser = argparse.ArgumentParser(
+        prog="pdf_merger_cli",
+        description="SpeedConnect PDF Merger - linha de comando"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    merge = subparsers.add_parser("merge", help="Juntar PDFs em um único arquivo")
+    merge.add_argument("files", nargs="*", help="PDFs de entrada (após os da --input-dir)")
+    merge.add_argument("--input-dir", help="Pasta com os PDFs de entrada (ordem alfabética)")
+    merge.add_argument("--recursive", action="store_true", help="Incluir subpastas de --input-dir")
+    merge.add_argument("--max-depth", type=int,
+                       help="Profundidade máxima de subpastas com --recursive (1 = só as diretas)")
+    merge.add_argument("--max-files", type=int, help="Parar a busca após encontrar N PDFs")
+    merge.add_argument("--scan-workers", type=int, default=1,
+                       help="Pastas listadas em paralelo com --recursive (útil em compartilhamentos de rede)")
+    merge.add_argument("--output", "-o", required=True, help="Arquivo PDF de saída")
+    merge.add_argument("--pages", metavar="INTERVALO",
+                       help="Páginas copiadas de cada PDF, ex.: 1 (só as capas) ou 1-3,7,10- ; "
+                            "as demais não são lidas")
+    merge.add_argument("--mode", choices=sorted(MERGE_FUNCTIONS), default="streaming",
+                       help="Motor de junção (padrão: streaming, memória limitada)")
+    merge.add_argument("--parse-workers", type=int, default=DEFAULT_PARSE_WORKERS,
+                       help=f"Threads lendo os próximos PDFs em paralelo (0 = sequencial, "
+                            f"padrão: {DEFAULT_PARSE_WORKERS})")
+    merge.add_argument("--profile", choices=list(OUTPUT_PROFILES), default=DEFAULT_OUTPUT_PROFILE,
+                       help="Perfil de saída: fast (cópia direta), balanced (object streams) "
+                            "ou smallest (recompressão máxima)")
+    merge.add_argument("--image-dpi", type=int,
+                       help="Reduzir imagens acima deste DPI e recomprimi-las em JPEG (ex.: 150)")
+    merge.add_argument("--jpeg-quality", type=int, default=75,
+                       help="Qualidade JPEG das imagens otimizadas (padrão: 75)")
+    merge.add_argument("--checkpoint", action="store_true",
+                       help="Juntar em partes salvas em disco; rodar de novo retoma após uma falha")
+    merge.add_argument("--tree", action="store_true",
+                       help="Junção em árvore: partes juntadas em paralelo e depois unidas "
+                            "(para milhares de arquivos)")
+    merge.add_argument("--tree-workers", type=int,
+                       help="Processos por nível com --tree (padrão: nº de núcleos)")
+    merge.add_argument("--chunk-size", type=int,
+                       help="PDFs por parte com --checkpoint (padrão: 200) ou --tree (padrão: 250)")
+    merge.add_argument("--checkpoint-dir",
+                       help="Pasta das partes com --checkpoint (padrão: <saída>.checkpoint)")
+    merge.add_argument("--split-size", type=float, metavar="MB",
+                       help="Dividir a saída em <saída>_001.pdf, <saída>_002.pdf... de até MB megabytes")
+    merge.add_argument("--split-pages", type=int, metavar="N",
+                       help="Dividir a saída em partes de até N páginas (combinável com --split-size)")
+    merge.add_argument("--skip-errors", action="store_true",
+                       help="Ignorar PDFs corrompidos ou protegidos e continuar a junção")
+    merge.add_argument("--skip-report",
+                       help="Salvar em JSON os PDFs ignorados, com motivo e tempo")
+    merge.add_argument("--no-dedup", action="store_true",
+                       help="Não unificar recursos idênticos (fontes, imagens, perfis ICC)")
+    merge.add_argument("--overwrite", action="store_true", help="Substituir a saída se existir")
+    merge.add_argument("--fsync", action="store_true",
+                       help="Forçar a gravação em disco antes de publicar a saída (mais lento)")
+    merge.add_argument("--json", action="store_true", help="Imprimir estatísticas em JSON")
+    merge.add_argument("--quiet", "-q", action="store_true", help="Não imprimir resumo")
+    merge.set_defaults(handler=command_merge)
+
+    batch = subparsers.add_parser("batch", help="Executar vários merges a partir de um manifesto")
+    batch.add_argument("manifest", help="Manifesto .json ou .csv (colunas output,input)")
+    batch.add_argument("--workers", "-j", type=int, help="Processos simultâneos (padrão: nº de núcleos)")
+    batch.add_argument("--timeout", type=float, help="Tempo limite por job, em segundos")
+    batch.add_argument("--mode", choices=sorted(MERGE_FUNCTIONS), default="streaming",
+                       help="Motor de junção (padrão: streaming, memória limitada)")
+    batch.add_argument("--profile", choices=list(OUTPUT_PROFILES), default=DEFAULT_OUTPUT_PROFILE,
+                       help="Perfil de saída de cada job")
+    batch.add_argument("--image-dpi", type=int,
+                       help="Reduzir imagens acima deste DPI em cada job")
+    batch.add_argument("--skip-errors", action="store_true",
+                       help="Ignorar PDFs corrompidos ou protegidos em vez de falhar o job")
+    batch.add_argument("--fsync", action="store_true",
+                       help="Forçar a gravação em disco de cada saída antes de publicá-la")
+    batch.add_argument("--report", help="Salvar o relatório completo em JSON neste arquivo")
+    batch.add_argument("--json", action="store_true", help="Imprimir o relatório em JSON")
+    batch.add_argument("--quiet", "-q", action="store_true", help="Não imprimir resumo")
+    batch.set_defaults(handler=command_batch)
+
+    watch = subparsers.add_parser("watch", help="Monitorar uma pasta e juntar os PDFs novos")
+    watch.add_argument("folder", help="Pasta monitorada (sem subpastas)")
+    watch.add_argument("--output-dir", help="Pasta das saídas (padrão: a própria pasta monitorada)")
+    watch.add_argument("--prefix", default="merge", help="Prefixo das saídas: <prefixo>_AAAAMMDD_HHMMSS.pdf")
+    watch.add_argument("--settle", type=float, default=5.0,
+                       help="Segundos sem alterações antes de juntar um arquivo (padrão: 5)")
+    watch.add_argument("--poll-interval", type=float, default=2.0,
+                       help="Intervalo de nova varredura, em segundos (padrão: 2)")
+    watch.add_argument("--poll", action="store_true", help="Usar só varredura periódica, sem inotify")
+    watch.add_argument("--state", help="Arquivo SQLite com os PDFs já processados "
+                                       "(padrão: .pdf_watch_state.sqlite3 na pasta de saída)")
+    watch.add_argument("--mode", choices=sorted(MERGE_FUNCTIONS), default="streaming",
+                       help="Motor de junção (padrão: streaming, memória limitada)")
+    watch.add_argument("--profile", choices=list(OUTPUT_PROFILES), default=DEFAULT_OUTPUT_PROFILE,
+                       help="Perfil de saída")
+    watch.add_argument("--fsync", action="store_true",
+                       help="Forçar a gravação em disco de cada saída antes de publicá-la")
+    watch.add_argument("--json", action="store_true", help="Imprimir um evento JSON por linha")
+    watch.add_argument("--quiet", "-q", action="store_true", help="Não imprimir eventos")
+    watch.set_defaults(handler=command_watch)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
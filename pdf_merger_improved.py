@@ -24,6 +24,10 @@ import re
 import threading
 import time
 import json
+import multiprocessing
+import queue
+from bisect import bisect_left
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 import customtkinter as ctk
@@ -35,13 +39,23 @@ try:
 except ImportError:
     DRAG_DROP_AVAILABLE = False
     print("⚠️ tkinterdnd2 não disponível - drag-and-drop desabilitado")
-try:
-    from pypdf import PdfWriter as PdfMerger
-except ImportError:
-    try:
-        from PyPDF2 import PdfMerger
-    except ImportError:
-        from pypdf import PdfMerger
+from pdf_merge_engine import (
+    MergeCancelled,
+    PDFMergeError,
+    ProgressChannel,
+    find_pdf_files,
+    find_split_parts,
+    merge_pdfs_in_memory,
+    merge_pdfs_split,
+    merge_pdfs_streaming,
+    parse_page_ranges,
+    validate_pdf,
+)
+from pdf_image_optimizer import ImageOptimizer
+from pdf_scanner import scan_pdf_files
+from pdf_tree_merge import merge_pdfs_tree
+from pdf_validation_cache import PDFValidationCache
+from pdf_watcher import FolderWatcher
 
 
 class PDFMergerApp:
@@ -51,6 +65,23 @@ class PDFMergerApp:
     MAX_FILENAME_LENGTH = 200
     INVALID_CHARS = r'[<>:"/\\|?*]'
     APPEARANCE_MODES = ["System", "Dark", "Light"]
+    MERGE_MODES = ["Padrão", "Streaming", "Árvore"]
+    OUTPUT_PROFILE_LABELS = {"Rápido": "fast", "Equilibrado": "balanced", "Menor": "smallest"}
+    # Limite de tamanho por arquivo de saída (sistemas que recusam PDFs grandes)
+    SPLIT_SIZE_LABELS = {"Não": None, "25 MB": 25, "50 MB": 50, "100 MB": 100}
+    IMAGE_TARGET_DPI = 150
+    VALIDATION_POLL_MS = 50
+    LIST_VISIBLE_ROWS = 6  # Tamanho do pool de linhas da lista virtualizada
+    LIST_ROW_HEIGHT = 38  # 36px do item + 2px de espaçamento
+    LIST_AUTOSCROLL_MS = 120
+    PROGRESS_UPDATES_PER_SECOND = 10  # Limite de atualizações da barra durante a junção
+    VALIDATION_REFRESH_MS = 300
+    SCAN_POLL_MS = 50
+    SCAN_BATCHES_PER_TICK = 4  # Lotes de PDFs exibidos por ciclo do loop do Tk
+    SCAN_DEPTH_OPTIONS = ["1", "2", "3", "5", "Ilimitada"]
+    FOLDER_SCAN_MAX_FILES = 5000  # Limite de checkboxes criados por busca
+    WATCH_POLL_MS = 500  # Intervalo de leitura dos eventos do monitoramento
+    SUCCESS_MESSAGE_MS = 4000  # Tempo em que "PDFs unidos com sucesso" fica visível
     
     def __init__(self):
         """Initialize the application."""
@@ -161,7 +192,14 @@ class PDFMergerApp:
         # Se estiver em processo de merge, confirmar com o usuário
         try:
             if getattr(self, 'is_merging', False):
-                if messagebox.askokcancel("Sair", "Uma operação está em andamento. Deseja sair mesmo assim?"):
+                if messagebox.askokcancel("Sair", "Uma operação está em andamento. Deseja cancelá-la e sair?"):
+                    # Cancelar e aguardar a thread, que remove o arquivo temporário
+                    self.cancelar_juntar()
+                    if self.merge_thread is not None:
+                        self.merge_thread.join(timeout=30)
+                    self.stop_folder_watcher(wait=True)
+                    self.shutdown_validation_pool()
+                    self.close_validation_cache()
                     self.root.destroy()
                 return
         except Exception:
@@ -169,6 +207,9 @@ class PDFMergerApp:
             pass
         
         # Fechar a janela
+        self.stop_folder_watcher(wait=True)
+        self.shutdown_validation_pool()
+        self.close_validation_cache()
         try:
             self.root.destroy()
         except Exception:
@@ -183,10 +224,38 @@ class PDFMergerApp:
         self.auto_merge_var = ctk.BooleanVar(value=False)  # Auto-merge opcional
         self.auto_open_var = ctk.BooleanVar(value=True)   # Auto-abrir por padrão
         self.show_feedback_var = ctk.BooleanVar(value=False)  # Feedback visual desabilitado por padrão
+        self.merge_mode_var = ctk.StringVar(value="Padrão")  # Streaming limita a memória em lotes grandes
+        self.output_profile_var = ctk.StringVar(value="Rápido")  # Compressão do arquivo final
+        self.split_size_var = ctk.StringVar(value="Não")  # Dividir a saída em partes de até N MB
+        self.optimize_images_var = ctk.BooleanVar(value=False)  # Reduzir scans de alta resolução
+        self.include_subfolders_var = ctk.BooleanVar(value=False)  # Busca recursiva no modo pasta
+        self.scan_max_depth_var = ctk.StringVar(value="Ilimitada")
+        self.watch_folder_var = ctk.BooleanVar(value=False)  # Juntar automaticamente PDFs novos da pasta
         self.checkboxes = []  # Manter para compatibilidade
-        self.individual_files = []  # Lista para arquivos selecionados individualmente
+        self.individual_files = []  # (caminho, nome, páginas, selecionado, intervalo de páginas)
         self.file_items = []  # Lista para widgets dos itens drag-sortable
         self.is_merging = False
+        self.merge_thread = None
+        self.merge_cancel_event = None  # Sinalizado pelo botão Cancelar
+        self.merge_outcome = None  # (job, resultado) deixado pelo worker para o loop do Tk
+        self.progress_reset_after = None  # after() que volta a mensagem de sucesso ao estado inicial
+        self.progress_channel = ProgressChannel()  # Worker publica, loop do Tk consome
+        self.validation_pool = None  # Pool criado sob demanda
+        self.validation_pending = []  # [(caminho, future, chave_cache)] na ordem de seleção
+        self.validation_invalid = []
+        self.validation_added = 0
+        self.validation_last_refresh = 0.0
+        self.validation_cache = self.open_validation_cache()
+        self.scan_generation = 0  # Incrementado a cada busca; resultados antigos são ignorados
+        self.scan_queue = None
+        self.scan_cancel_event = None
+        self.folder_paths = []  # Caminhos da pasta em ordem alfabética
+        self.folder_widgets = []  # Checkboxes na mesma ordem de folder_paths
+        self.scan_status_frame = None
+        self.scan_status_label = None
+        self.folder_watcher = None
+        self.watch_events = queue.Queue()  # Eventos da thread do watcher para o loop do Tk
+        self.watch_poll_after = None  # after() de poll_watch_events; um único loop por vez
         
     def create_widgets(self):
         """Create all GUI widgets."""
@@ -382,54 +451,23 @@ class PDFMergerApp:
         # Limpar seleção de pasta quando arrastar arquivos
         self.pasta_var.set("")
         
-        # Validar e adicionar arquivos
-        arquivos_validos = 0
-        arquivos_invalidos = []
-        
-        for arquivo in pdf_files:
-            if arquivo not in [f[0] for f in self.individual_files]:
-                # Validar arquivo PDF
-                is_valid, error_msg, page_count = self.validate_pdf_file(arquivo)
-                
-                if is_valid:
-                    filename = os.path.basename(arquivo)
-                    # Auto-selecionar arquivo (True no final)
-                    self.individual_files.append((arquivo, filename, page_count, True))
-                    arquivos_validos += 1
-                else:
-                    arquivos_invalidos.append((os.path.basename(arquivo), error_msg))
-        
-        # Mostrar resultado apenas se houver erros
-        if arquivos_invalidos:
-            invalid_list = "\n".join([f"• {name}: {error}" for name, error in arquivos_invalidos])
-            messagebox.showwarning(
-                "Alguns Arquivos Inválidos",
-                f"Os seguintes arquivos não puderam ser adicionados:\n\n{invalid_list}"
-            )
-        
-        if arquivos_validos > 0:
-            self.atualizar_interface_com_arquivos()
-            self.atualizar_info_section()
-            self.listar_arquivos_individuais()
-            
-            # Feedback visual sutil apenas se habilitado
-            if self.show_feedback_var.get():
-                self.mostrar_feedback_sucesso(arquivos_validos)
-        elif not arquivos_invalidos:
-            # Feedback sutil para arquivos duplicados apenas se habilitado
-            if self.show_feedback_var.get():
-                self.mostrar_feedback_duplicados()
+        # Validar e adicionar arquivos em paralelo
+        self.validar_e_adicionar_arquivos(pdf_files)
         
     def create_pdf_list(self):
-        """Create clean, minimal PDF list."""
+        """Create clean, minimal PDF list backed by a virtualized row pool."""
         # Sem label - lista fala por si
-        self.frame_scroll = ctk.CTkScrollableFrame(
+        # Frame simples: a rolagem da lista é feita pelo pool de linhas
+        self.frame_scroll = ctk.CTkFrame(
             self.main_scroll, 
             corner_radius=12,
-            height=200,  # Mais compacto
             fg_color=("gray98", "gray12")
         )
         self.frame_pdfs = self.frame_scroll
+        self.list_offset = 0  # Índice do primeiro arquivo visível
+        self.row_pool = []
+        self.virtual_list = None
+        self.list_last_autoscroll = 0.0
         
     def create_selection_buttons_minimal(self):
         """Create minimal selection control buttons - removed for cleaner interface."""
@@ -439,13 +477,54 @@ class PDFMergerApp:
     def create_minimal_controls(self):
         """Create minimal controls for file list."""
         # Apenas instrução sutil
-        instruction_label = ctk.CTkLabel(
+        self.list_instruction_label = ctk.CTkLabel(
             self.frame_pdfs,
             text="Arraste para reordenar • Clique direito para opções",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60")
         )
-        instruction_label.pack(pady=(15, 20))  # Mais whitespace
+        
+    def create_virtual_list(self):
+        """Create the fixed pool of row widgets recycled while scrolling."""
+        # Descartar conteúdo antigo (modo pasta legado, mensagens)
+        try:
+            for widget in self.frame_pdfs.winfo_children():
+                widget.destroy()
+        except Exception as e:
+            print(f"Erro ao limpar widgets: {e}")
+        
+        self.create_minimal_controls()
+        
+        self.list_empty_label = ctk.CTkLabel(
+            self.frame_pdfs,
+            text="📄 Use a área de drag & drop acima para adicionar PDFs",
+            font=ctk.CTkFont(size=14),
+            text_color="gray"
+        )
+        
+        self.virtual_list = ctk.CTkFrame(
+            self.frame_pdfs,
+            fg_color="transparent",
+            height=self.LIST_VISIBLE_ROWS * self.LIST_ROW_HEIGHT
+        )
+        self.virtual_list.pack_propagate(False)
+        
+        self.list_scrollbar = ctk.CTkScrollbar(self.virtual_list, command=self.on_list_scrollbar)
+        self.list_scrollbar.pack(side="right", fill="y", pady=2)
+        
+        self.list_rows = ctk.CTkFrame(self.virtual_list, fg_color="transparent")
+        self.list_rows.pack(side="left", fill="both", expand=True)
+        self.bind_list_mouse_wheel(self.list_rows)
+        
+        self.row_pool = [self.create_file_row() for _ in range(self.LIST_VISIBLE_ROWS)]
+        self.file_items = []
+        
+    def virtual_list_exists(self):
+        """Check whether the row pool is still alive (legacy code may destroy it)."""
+        try:
+            return self.virtual_list is not None and bool(self.virtual_list.winfo_exists())
+        except Exception:
+            return False
         
     def create_info_section(self):
         """Create minimal stats display integrated with drop area."""
@@ -468,7 +547,7 @@ class PDFMergerApp:
             return
             
         total_files = len(self.individual_files)
-        total_pages = sum(file_info[2] if len(file_info) >= 3 else 0 for file_info in self.individual_files)
+        total_pages = sum(self.get_selected_page_count(file_info) for file_info in self.individual_files)
         
         # Atualizar subtítulo no header
         if total_pages > 0:
@@ -635,13 +714,20 @@ class PDFMergerApp:
         )
         self.advanced_expanded = False
         
-        # Conteúdo das opções avançadas
-        options_row = ctk.CTkFrame(self.advanced_content, fg_color="transparent")
-        options_row.pack(fill="x", padx=15, pady=12)
+        # Conteúdo das opções avançadas, em linhas curtas: numa linha só os
+        # controles passavam da largura da janela
+        behavior_row = ctk.CTkFrame(self.advanced_content, fg_color="transparent")
+        behavior_row.pack(fill="x", padx=15, pady=(12, 4))
+        folder_row = ctk.CTkFrame(self.advanced_content, fg_color="transparent")
+        folder_row.pack(fill="x", padx=15, pady=4)
+        output_row = ctk.CTkFrame(self.advanced_content, fg_color="transparent")
+        output_row.pack(fill="x", padx=15, pady=4)
+        extras_row = ctk.CTkFrame(self.advanced_content, fg_color="transparent")
+        extras_row.pack(fill="x", padx=15, pady=(4, 12))
         
         # Auto-merge checkbox
         self.auto_merge_checkbox = ctk.CTkCheckBox(
-            options_row,
+            behavior_row,
             text="Auto-Juntar",
             variable=self.auto_merge_var,
             font=ctk.CTkFont(size=11),
@@ -651,7 +737,7 @@ class PDFMergerApp:
         
         # Auto-open checkbox
         self.auto_open_checkbox = ctk.CTkCheckBox(
-            options_row,
+            behavior_row,
             text="Auto-Abrir",
             variable=self.auto_open_var,
             font=ctk.CTkFont(size=11)
@@ -660,16 +746,56 @@ class PDFMergerApp:
         
         # Show feedback checkbox
         self.show_feedback_checkbox = ctk.CTkCheckBox(
-            options_row,
+            behavior_row,
             text="Mostrar Feedback",
             variable=self.show_feedback_var,
             font=ctk.CTkFont(size=11)
         )
         self.show_feedback_checkbox.pack(side="left", padx=(0, 20))
         
+        # Reduzir imagens digitalizadas (processado em paralelo)
+        self.optimize_images_checkbox = ctk.CTkCheckBox(
+            extras_row,
+            text=f"Otimizar Imagens ({self.IMAGE_TARGET_DPI} dpi)",
+            variable=self.optimize_images_var,
+            font=ctk.CTkFont(size=11)
+        )
+        self.optimize_images_checkbox.pack(side="left", padx=(0, 20))
+        
+        # Busca recursiva no modo pasta
+        self.include_subfolders_checkbox = ctk.CTkCheckBox(
+            folder_row,
+            text="Subpastas",
+            variable=self.include_subfolders_var,
+            command=self.on_scan_options_changed,
+            font=ctk.CTkFont(size=11)
+        )
+        self.include_subfolders_checkbox.pack(side="left", padx=(0, 5))
+        
+        self.scan_depth_menu = ctk.CTkOptionMenu(
+            folder_row,
+            variable=self.scan_max_depth_var,
+            values=self.SCAN_DEPTH_OPTIONS,
+            command=lambda _: self.on_scan_options_changed(),
+            width=90,
+            height=24,
+            font=ctk.CTkFont(size=10)
+        )
+        self.scan_depth_menu.pack(side="left", padx=(0, 20))
+        
+        # Monitorar a pasta selecionada e juntar os PDFs novos
+        self.watch_folder_checkbox = ctk.CTkCheckBox(
+            folder_row,
+            text="Monitorar Pasta",
+            variable=self.watch_folder_var,
+            command=self.on_watch_folder_changed,
+            font=ctk.CTkFont(size=11)
+        )
+        self.watch_folder_checkbox.pack(side="left", padx=(0, 20))
+        
         # Seletor de tema
         theme_label = ctk.CTkLabel(
-            options_row,
+            extras_row,
             text="Tema:",
             font=ctk.CTkFont(size=11),
             text_color=("gray50", "gray60")
@@ -677,7 +803,7 @@ class PDFMergerApp:
         theme_label.pack(side="left", padx=(0, 5))
         
         self.appearance_menu = ctk.CTkOptionMenu(
-            options_row,
+            extras_row,
             variable=self.appearance_var,
             values=self.APPEARANCE_MODES,
             command=self.change_appearance,
@@ -687,9 +813,66 @@ class PDFMergerApp:
         )
         self.appearance_menu.pack(side="left", padx=(0, 20))
         
+        # Seletor do modo de junção
+        merge_mode_label = ctk.CTkLabel(
+            output_row,
+            text="Modo:",
+            font=ctk.CTkFont(size=11),
+            text_color=("gray50", "gray60")
+        )
+        merge_mode_label.pack(side="left", padx=(0, 5))
+        
+        self.merge_mode_menu = ctk.CTkOptionMenu(
+            output_row,
+            variable=self.merge_mode_var,
+            values=self.MERGE_MODES,
+            width=90,
+            height=24,
+            font=ctk.CTkFont(size=10)
+        )
+        self.merge_mode_menu.pack(side="left", padx=(0, 20))
+        
+        # Seletor do perfil de saída (tamanho x tempo de gravação)
+        output_profile_label = ctk.CTkLabel(
+            output_row,
+            text="Saída:",
+            font=ctk.CTkFont(size=11),
+            text_color=("gray50", "gray60")
+        )
+        output_profile_label.pack(side="left", padx=(0, 5))
+        
+        self.output_profile_menu = ctk.CTkOptionMenu(
+            output_row,
+            variable=self.output_profile_var,
+            values=list(self.OUTPUT_PROFILE_LABELS),
+            width=100,
+            height=24,
+            font=ctk.CTkFont(size=10)
+        )
+        self.output_profile_menu.pack(side="left", padx=(0, 20))
+        
+        # Divisão da saída em partes de tamanho limitado
+        split_size_label = ctk.CTkLabel(
+            output_row,
+            text="Dividir:",
+            font=ctk.CTkFont(size=11),
+            text_color=("gray50", "gray60")
+        )
+        split_size_label.pack(side="left", padx=(0, 5))
+        
+        self.split_size_menu = ctk.CTkOptionMenu(
+            output_row,
+            variable=self.split_size_var,
+            values=list(self.SPLIT_SIZE_LABELS),
+            width=80,
+            height=24,
+            font=ctk.CTkFont(size=10)
+        )
+        self.split_size_menu.pack(side="left", padx=(0, 20))
+        
         # Botão de ajuda
         help_btn = ctk.CTkButton(
-            options_row,
+            behavior_row,
             text="?",
             command=self.show_help_tooltip,
             width=24,
@@ -699,6 +882,83 @@ class PDFMergerApp:
         )
         help_btn.pack(side="right")
     
+    def on_watch_folder_changed(self):
+        """Start or stop watching the selected folder."""
+        if not self.watch_folder_var.get():
+            self.stop_folder_watcher()
+            self.progress_label.configure(text="", text_color=("gray50", "gray60"))
+            return
+        
+        pasta = self.pasta_var.get()
+        if not pasta or not os.path.isdir(pasta):
+            self.watch_folder_var.set(False)
+            messagebox.showinfo("Monitorar Pasta", "Selecione primeiro a pasta a ser monitorada.")
+            return
+        
+        output_dir = self.output_dir_var.get() or pasta
+        self.stop_folder_watcher()  # Nunca dois watchers (nem dois loops de eventos) ao mesmo tempo
+        self.folder_watcher = FolderWatcher(
+            pasta,
+            output_dir,
+            self.get_watch_state_file_path(),
+            mode="memory" if self.merge_mode_var.get() == "Padrão" else "streaming",
+            profile=self.OUTPUT_PROFILE_LABELS[self.output_profile_var.get()],
+            callback=lambda event, data: self.watch_events.put((event, data))
+        )
+        self.folder_watcher.start()
+        self.progress_label.configure(
+            text=f"👀 Monitorando {os.path.basename(pasta)}",
+            text_color=("#2196F3", "#64B5F6")
+        )
+        self.watch_poll_after = self.root.after(self.WATCH_POLL_MS, self.poll_watch_events)
+    
+    def stop_folder_watcher(self, wait=False):
+        """
+        Stop the folder watcher and its event loop.
+        
+        A merge in progress is cancelled; nothing is recorded for its files,
+        so they are merged the next time the folder is watched.
+        """
+        if self.watch_poll_after is not None:
+            self.root.after_cancel(self.watch_poll_after)
+            self.watch_poll_after = None
+        if self.folder_watcher is not None:
+            # Sem esperar, a thread termina sozinha assim que a junção em andamento for cancelada
+            self.folder_watcher.stop(timeout=None if wait else 0)
+            self.folder_watcher = None
+    
+    def poll_watch_events(self):
+        """Show watcher events on the Tk loop while watching is enabled."""
+        self.watch_poll_after = None
+        if self.folder_watcher is None:
+            return
+        try:
+            while True:
+                event, data = self.watch_events.get_nowait()
+                if event == "merged":
+                    self.progress_label.configure(
+                        text=f"✅ {data['files']} PDFs novos unidos em {os.path.basename(data['output'])}",
+                        text_color=("#2196F3", "#64B5F6")
+                    )
+                    if self.auto_open_var.get():
+                        self.abrir_arquivo(data["output"])
+                elif event == "pending" and data:
+                    self.progress_label.configure(
+                        text=f"⏳ {data} PDFs novos aguardando...",
+                        text_color=("gray50", "gray60")
+                    )
+                elif event == "error":
+                    print(f"Monitoramento: {data}")
+                    self.progress_label.configure(text=f"⚠️ {data}", text_color="orange")
+        except queue.Empty:
+            pass
+        self.watch_poll_after = self.root.after(self.WATCH_POLL_MS, self.poll_watch_events)
+    
+    def on_scan_options_changed(self):
+        """Re-scan the selected folder when the subfolder options change."""
+        if self.pasta_var.get():
+            self.listar_pdfs()
+    
     def toggle_advanced_options(self):
         """Toggle advanced options visibility."""
         if self.advanced_expanded:
@@ -867,13 +1127,162 @@ class PDFMergerApp:
         Returns:
             Tuple of (is_valid, error_message, page_count)
         """
+        return validate_pdf(pdf_path)
+    
+    def get_validation_pool(self) -> ProcessPoolExecutor:
+        """Get the shared validation pool, creating it on first use."""
+        if self.validation_pool is None:
+            self.validation_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return self.validation_pool
+    
+    def open_validation_cache(self) -> Optional[PDFValidationCache]:
+        """Open the persistent validation cache, or None if it is unavailable."""
+        try:
+            return PDFValidationCache(self.get_cache_file_path())
+        except Exception as e:
+            print(f"Cache de validação indisponível: {e}")
+            return None
+    
+    def close_validation_cache(self):
+        """Flush and close the validation cache."""
+        if self.validation_cache is not None:
+            try:
+                self.validation_cache.close()
+            except Exception as e:
+                print(f"Erro ao fechar cache de validação: {e}")
+            self.validation_cache = None
+    
+    def consultar_cache_validacao(self, arquivo):
+        """
+        Look up a file in the validation cache.
+        
+        Returns:
+            Tuple of (cache_key, cached_result); either may be None
+        """
+        if self.validation_cache is None:
+            return None, None
+        try:
+            chave = self.validation_cache.make_key(arquivo)
+            return chave, self.validation_cache.get(arquivo, chave)
+        except Exception:
+            # Arquivo inacessível - a validação completa reporta o erro
+            return None, None
+    
+    def guardar_cache_validacao(self, arquivo, chave, resultado):
+        """Store a fresh validation result in the cache."""
         try:
-            from pypdf import PdfReader
-            reader = PdfReader(pdf_path)
-            page_count = len(reader.pages)
-            return True, "", page_count
+            self.validation_cache.put(arquivo, chave, resultado)
         except Exception as e:
-            return False, str(e), 0
+            print(f"Erro ao gravar cache de validação: {e}")
+    
+    def shutdown_validation_pool(self):
+        """Stop the validation pool without waiting for pending checks."""
+        if self.validation_pool is not None:
+            self.validation_pool.shutdown(wait=False, cancel_futures=True)
+            self.validation_pool = None
+    
+    def validar_e_adicionar_arquivos(self, arquivos):
+        """
+        Validate files concurrently and add them to the list as results arrive.
+        
+        Files are added in selection order; validation runs in a process pool
+        and results are collected from the Tk loop, so the window stays responsive.
+        
+        Args:
+            arquivos: Paths selected or dropped by the user
+        """
+        conhecidos = {f[0] for f in self.individual_files}
+        conhecidos.update(pendente[0] for pendente in self.validation_pending)
+        novos = [arquivo for arquivo in arquivos if arquivo not in conhecidos]
+        
+        if not novos:
+            # Feedback sutil para arquivos duplicados apenas se habilitado
+            if not self.validation_pending and self.show_feedback_var.get():
+                self.mostrar_feedback_duplicados()
+            return
+        
+        ja_em_andamento = bool(self.validation_pending)
+        for arquivo in novos:
+            chave, resultado = self.consultar_cache_validacao(arquivo)
+            if resultado is not None:
+                # Arquivo conhecido e inalterado - sem reabrir o PDF
+                future = Future()
+                future.set_result(resultado)
+                chave = None
+            else:
+                future = self.get_validation_pool().submit(validate_pdf, arquivo)
+            self.validation_pending.append((arquivo, future, chave))
+        
+        if not ja_em_andamento:
+            self.validation_invalid = []
+            self.validation_added = 0
+            self.root.after(self.VALIDATION_POLL_MS, self.coletar_validacoes)
+    
+    def coletar_validacoes(self):
+        """Collect finished validations from the pool (runs on the Tk loop)."""
+        novos = 0
+        while self.validation_pending and self.validation_pending[0][1].done():
+            arquivo, future, chave = self.validation_pending.pop(0)
+            try:
+                is_valid, error_msg, page_count = future.result()
+                if chave is not None:
+                    self.guardar_cache_validacao(arquivo, chave, (is_valid, error_msg, page_count))
+            except Exception as e:
+                is_valid, error_msg, page_count = False, str(e), 0
+            
+            if is_valid:
+                # Auto-selecionar arquivo; intervalo vazio = todas as páginas
+                self.individual_files.append((arquivo, os.path.basename(arquivo), page_count, True, ""))
+                novos += 1
+            else:
+                self.validation_invalid.append((os.path.basename(arquivo), error_msg))
+        
+        self.validation_added += novos
+        
+        if self.validation_pending:
+            total = self.validation_added + len(self.validation_invalid) + len(self.validation_pending)
+            done = total - len(self.validation_pending)
+            self.progress_label.configure(text=f"Validando: {done}/{total} PDFs")
+            
+            # Atualizar a lista em intervalos para não reconstruí-la a cada arquivo
+            now = time.monotonic()
+            if novos and (now - self.validation_last_refresh) * 1000 >= self.VALIDATION_REFRESH_MS:
+                self.validation_last_refresh = now
+                self.atualizar_info_section()
+                self.listar_arquivos_individuais()
+            
+            self.root.after(self.VALIDATION_POLL_MS, self.coletar_validacoes)
+            return
+        
+        self.finalizar_validacoes()
+    
+    def finalizar_validacoes(self):
+        """Update the interface once every pending validation has finished."""
+        self.progress_label.configure(text="")
+        if self.validation_cache is not None:
+            try:
+                self.validation_cache.flush()
+            except Exception as e:
+                print(f"Erro ao gravar cache de validação: {e}")
+        arquivos_validos = self.validation_added
+        arquivos_invalidos = self.validation_invalid
+        
+        # Mostrar resultado da validação apenas se houver erros
+        if arquivos_invalidos:
+            invalid_list = "\n".join([f"• {name}: {error}" for name, error in arquivos_invalidos])
+            messagebox.showwarning(
+                "Arquivos Inválidos",
+                f"Os seguintes arquivos não puderam ser adicionados:\n\n{invalid_list}"
+            )
+        
+        if arquivos_validos > 0:
+            self.atualizar_interface_com_arquivos()
+            self.atualizar_info_section()
+            self.listar_arquivos_individuais()
+            
+            # Feedback sutil apenas se habilitado nas opções
+            if self.show_feedback_var.get():
+                self.mostrar_feedback_sucesso(arquivos_validos)
     
     def get_pdf_files(self, directory: str, include_subfolders: bool = False) -> List[str]:
         """
@@ -886,31 +1295,12 @@ class PDFMergerApp:
         Returns:
             List of PDF file paths
         """
-        pdf_files = []
-        
         try:
-            if include_subfolders:
-                print(f"Buscando PDFs em subpastas de: {directory}")
-                for root, dirs, files in os.walk(directory):
-                    for file in files:
-                        if file.lower().endswith('.pdf'):
-                            full_path = os.path.join(root, file)
-                            pdf_files.append(full_path)
-                            print(f"PDF encontrado: {full_path}")
-            else:
-                print(f"Buscando PDFs em: {directory}")
-                if os.path.exists(directory) and os.path.isdir(directory):
-                    for file in os.listdir(directory):
-                        if file.lower().endswith('.pdf'):
-                            full_path = os.path.join(directory, file)
-                            pdf_files.append(full_path)
-                            print(f"PDF encontrado: {full_path}")
-                else:
-                    print(f"Diretório não existe ou não é válido: {directory}")
-                        
-            print(f"Total de PDFs encontrados: {len(pdf_files)}")
-            return sorted(pdf_files)
+            return find_pdf_files(directory, include_subfolders)
             
+        except NotADirectoryError as e:
+            print(e)
+            return []
         except Exception as e:
             print(f"Erro ao buscar PDFs: {e}")
             messagebox.showerror(
@@ -925,6 +1315,9 @@ class PDFMergerApp:
         if pasta:
             # Limpar arquivos individuais quando selecionar pasta
             self.individual_files.clear()
+            if self.watch_folder_var.get():
+                self.watch_folder_var.set(False)
+                self.on_watch_folder_changed()
             self.pasta_var.set(pasta)
             self.pasta_label.configure(text=f"Pasta: {pasta}")
             self.listar_pdfs()
@@ -939,43 +1332,8 @@ class PDFMergerApp:
             # Limpar seleção de pasta quando selecionar arquivos individuais
             self.pasta_var.set("")
             
-            # Validar e adicionar novos arquivos à lista
-            arquivos_validos = 0
-            arquivos_invalidos = []
-            
-            for arquivo in arquivos:
-                if arquivo not in [f[0] for f in self.individual_files]:
-                    # Validar arquivo PDF
-                    is_valid, error_msg, page_count = self.validate_pdf_file(arquivo)
-                    
-                    if is_valid:
-                        filename = os.path.basename(arquivo)
-                        # Auto-selecionar arquivo (True no final)
-                        self.individual_files.append((arquivo, filename, page_count, True))
-                        arquivos_validos += 1
-                    else:
-                        arquivos_invalidos.append((os.path.basename(arquivo), error_msg))
-            
-            # Mostrar resultado da validação apenas se houver erros
-            if arquivos_invalidos:
-                invalid_list = "\n".join([f"• {name}: {error}" for name, error in arquivos_invalidos])
-                messagebox.showwarning(
-                    "Arquivos Inválidos",
-                    f"Os seguintes arquivos não puderam ser adicionados:\n\n{invalid_list}"
-                )
-            
-            if arquivos_validos > 0:
-                self.atualizar_interface_com_arquivos()
-                self.atualizar_info_section()
-                self.listar_arquivos_individuais()
-                
-                # Feedback sutil apenas se habilitado nas opções
-                if self.show_feedback_var.get():
-                    self.mostrar_feedback_sucesso(arquivos_validos)
-            elif not arquivos_invalidos:
-                # Feedback sutil para arquivos duplicados apenas se habilitado
-                if self.show_feedback_var.get():
-                    self.mostrar_feedback_duplicados()
+            # Validar e adicionar novos arquivos à lista em paralelo
+            self.validar_e_adicionar_arquivos(arquivos)
             
     def selecionar_pasta_destino(self):
         """Handle output directory selection."""
@@ -994,7 +1352,7 @@ class PDFMergerApp:
         """Update interface when files are added - no green text."""
         if self.individual_files:
             count = len(self.individual_files)
-            total_pages = sum(file_info[2] if len(file_info) >= 3 else 0 for file_info in self.individual_files)
+            total_pages = sum(self.get_selected_page_count(file_info) for file_info in self.individual_files)
             
             # Não mostrar mais o texto verde - removido conforme solicitado
             # self.pasta_label.configure(text="")  # Limpar qualquer texto
@@ -1180,6 +1538,18 @@ class PDFMergerApp:
         os.makedirs(config_dir, exist_ok=True)
         return os.path.join(config_dir, "pdf_merger_config.json")
         
+    def get_watch_state_file_path(self):
+        """Get the path to the folder watcher state database."""
+        config_dir = os.path.expanduser("~/.speedconnect")
+        os.makedirs(config_dir, exist_ok=True)
+        return os.path.join(config_dir, "pdf_watch_state.sqlite3")
+        
+    def get_cache_file_path(self):
+        """Get the path to the validation cache database."""
+        config_dir = os.path.expanduser("~/.speedconnect")
+        os.makedirs(config_dir, exist_ok=True)
+        return os.path.join(config_dir, "pdf_validation_cache.sqlite3")
+        
     def save_preferences(self):
         """Save user preferences to config file."""
         try:
@@ -1188,7 +1558,13 @@ class PDFMergerApp:
                 "default_output_dir": self.output_dir_var.get(),
                 "window_geometry": self.root.geometry(),
                 "auto_merge": self.auto_merge_var.get(),
-                "auto_open": self.auto_open_var.get()
+                "auto_open": self.auto_open_var.get(),
+                "merge_mode": self.merge_mode_var.get(),
+                "output_profile": self.output_profile_var.get(),
+                "split_size": self.split_size_var.get(),
+                "optimize_images": self.optimize_images_var.get(),
+                "include_subfolders": self.include_subfolders_var.get(),
+                "scan_max_depth": self.scan_max_depth_var.get()
             }
             
             config_path = self.get_config_file_path()
@@ -1227,6 +1603,24 @@ class PDFMergerApp:
                 if "auto_open" in preferences:
                     self.auto_open_var.set(preferences["auto_open"])
                     
+                if preferences.get("merge_mode") in self.MERGE_MODES:
+                    self.merge_mode_var.set(preferences["merge_mode"])
+                    
+                if preferences.get("output_profile") in self.OUTPUT_PROFILE_LABELS:
+                    self.output_profile_var.set(preferences["output_profile"])
+                    
+                if preferences.get("split_size") in self.SPLIT_SIZE_LABELS:
+                    self.split_size_var.set(preferences["split_size"])
+                    
+                if "optimize_images" in preferences:
+                    self.optimize_images_var.set(preferences["optimize_images"])
+                    
+                if "include_subfolders" in preferences:
+                    self.include_subfolders_var.set(preferences["include_subfolders"])
+                    
+                if preferences.get("scan_max_depth") in self.SCAN_DEPTH_OPTIONS:
+                    self.scan_max_depth_var.set(preferences["scan_max_depth"])
+                    
                 self.update_ui_from_preferences()
         except Exception as e:
             print(f"Erro ao carregar preferências: {e}")
@@ -1252,9 +1646,7 @@ class PDFMergerApp:
             print(f"Erro ao atualizar UI: {e}")
             
     def listar_pdfs(self):
-        """List all PDF files in the selected folder."""
-        print("=== INICIANDO LISTAGEM DE PDFs ===")
-        
+        """List all PDF files in the selected folder, streaming scan results in batches."""
         # Clear existing checkboxes safely
         try:
             for widget in self.frame_pdfs.winfo_children():
@@ -1263,153 +1655,282 @@ class PDFMergerApp:
             print(f"Erro ao limpar widgets: {e}")
         
         self.checkboxes.clear()
+        self.folder_paths = []
+        self.folder_widgets = []
+        self.file_items = []  # Pool da lista virtualizada foi destruído
+        self.cancelar_busca()  # Interromper e descartar uma busca anterior
         
-        # Force update to ensure widgets are cleared
-        self.frame_pdfs.update_idletasks()
-        
-        if not self.pasta_var.get():
-            print("Nenhuma pasta selecionada")
+        pasta = self.pasta_var.get()
+        if not pasta:
             return
-            
-        # Get PDF files (sem subpastas por padrão na nova interface minimalista)
-        include_subfolders = False  # Simplificado para interface minimalista
-        print(f"Pasta selecionada: {self.pasta_var.get()}")
-        print(f"Incluir subpastas: {include_subfolders}")
         
-        pdf_files = self.get_pdf_files(self.pasta_var.get(), include_subfolders)
+        include_subfolders = self.include_subfolders_var.get()
+        depth = self.scan_max_depth_var.get()
+        max_depth = int(depth) if depth.isdigit() else None
         
-        if not pdf_files:
-            print("Nenhum PDF encontrado - exibindo mensagem")
-            no_pdfs_label = ctk.CTkLabel(
-                self.frame_pdfs,
-                text="❌ Nenhum PDF encontrado nesta pasta.",
-                font=ctk.CTkFont(size=14),
-                text_color="red"
-            )
-            no_pdfs_label.pack(pady=20)
-            
-            # Debug info
-            debug_label = ctk.CTkLabel(
-                self.frame_pdfs,
-                text=f"📁 Pasta verificada: {self.pasta_var.get()}",
-                font=ctk.CTkFont(size=10),
-                text_color="gray"
-            )
-            debug_label.pack(pady=5)
-            return
-            
-        print(f"Criando checkboxes para {len(pdf_files)} PDFs")
+        # Linha de status com botão para cancelar buscas longas
+        self.scan_status_frame = ctk.CTkFrame(self.frame_pdfs, fg_color="transparent")
+        self.scan_status_frame.pack(anchor="w", fill="x", padx=10, pady=(5, 0))
+        self.scan_status_label = ctk.CTkLabel(
+            self.scan_status_frame,
+            text="🔍 Buscando PDFs...",
+            font=ctk.CTkFont(size=11),
+            text_color="gray"
+        )
+        self.scan_status_label.pack(side="left")
+        ctk.CTkButton(
+            self.scan_status_frame,
+            text="Cancelar",
+            command=self.cancelar_busca,
+            width=70,
+            height=22,
+            font=ctk.CTkFont(size=10)
+        ).pack(side="left", padx=(10, 0))
+        
+        # Busca em thread; o loop do Tk recebe os lotes pela fila
+        self.scan_queue = queue.Queue()
+        self.scan_cancel_event = threading.Event()
+        thread = threading.Thread(
+            target=self.buscar_pdfs_worker,
+            args=(pasta, include_subfolders, max_depth, self.scan_queue, self.scan_cancel_event),
+            daemon=True
+        )
+        thread.start()
+        self.root.after(self.SCAN_POLL_MS, self.coletar_resultados_busca,
+                        self.scan_generation, pasta, include_subfolders)
+    
+    def cancelar_busca(self):
+        """Stop the running folder scan, keeping the PDFs found so far."""
+        if self.scan_cancel_event is not None:
+            self.scan_cancel_event.set()
+            self.scan_cancel_event = None
+        self.scan_generation += 1
+        if self.scan_status_frame is not None and self.scan_status_frame.winfo_exists():
+            self.scan_status_frame.destroy()
+            if self.folder_paths:
+                print(f"Busca cancelada: {len(self.folder_paths)} PDFs listados")
+        self.scan_status_frame = None
+        self.scan_status_label = None
+    
+    def buscar_pdfs_worker(self, pasta, include_subfolders, max_depth, fila, cancel_event):
+        """Scan a folder in a background thread, queueing results in batches."""
+        try:
+            for batch in scan_pdf_files(pasta, include_subfolders, max_depth=max_depth,
+                                        max_files=self.FOLDER_SCAN_MAX_FILES,
+                                        cancel_event=cancel_event):
+                fila.put(("lote", batch))
+        except Exception as e:
+            fila.put(("erro", e))
+        fila.put(("fim", None))
+    
+    def coletar_resultados_busca(self, generation, pasta, include_subfolders):
+        """Show queued scan batches (runs on the Tk loop)."""
+        if generation != self.scan_generation:
+            return  # Outra busca começou depois desta
         
-        # Create checkboxes for each PDF
-        for i, pdf_path in enumerate(pdf_files):
-            var = ctk.BooleanVar(value=False)
-            
+        for _ in range(self.SCAN_BATCHES_PER_TICK):
+            try:
+                kind, payload = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if kind == "lote":
+                self.adicionar_pdfs_da_pasta(payload, pasta, include_subfolders)
+                self.scan_status_label.configure(text=f"🔍 Buscando PDFs... {len(self.folder_paths)} encontrados")
+            elif kind == "erro":
+                if isinstance(payload, NotADirectoryError):
+                    print(payload)
+                else:
+                    print(f"Erro ao buscar PDFs: {payload}")
+                    messagebox.showerror(
+                        "Erro de Acesso",
+                        f"Erro ao acessar a pasta:\n{str(payload)}\n\nVerifique se você tem permissão para acessar esta pasta."
+                    )
+            else:
+                self.finalizar_busca(pasta)
+                return
+        
+        self.root.after(self.SCAN_POLL_MS, self.coletar_resultados_busca,
+                        generation, pasta, include_subfolders)
+    
+    def adicionar_pdfs_da_pasta(self, batch, pasta, include_subfolders):
+        """Insert a batch of scanned PDFs as checkboxes, keeping alphabetical order."""
+        for pdf_path in batch:
             # Display relative path if in subfolder
             if include_subfolders:
                 try:
-                    display_name = os.path.relpath(pdf_path, self.pasta_var.get())
+                    display_name = os.path.relpath(pdf_path, pasta)
                 except ValueError:
                     display_name = pdf_path  # Fallback to full path
             else:
                 display_name = os.path.basename(pdf_path)
             
-            print(f"Criando checkbox {i+1}: {display_name}")
-                
+            var = ctk.BooleanVar(value=False)
             chk = ctk.CTkCheckBox(
                 self.frame_pdfs,
                 text=display_name,
                 variable=var,
                 font=ctk.CTkFont(size=12)
             )
-            chk.pack(anchor="w", padx=10, pady=3, fill="x")
-            self.checkboxes.append((pdf_path, var, display_name))
             
-        print(f"=== LISTAGEM COMPLETA: {len(self.checkboxes)} PDFs ===")
+            index = bisect_left(self.folder_paths, pdf_path)
+            if index < len(self.folder_widgets):
+                chk.pack(anchor="w", padx=10, pady=3, fill="x", before=self.folder_widgets[index])
+            else:
+                chk.pack(anchor="w", padx=10, pady=3, fill="x")
+            self.folder_paths.insert(index, pdf_path)
+            self.folder_widgets.insert(index, chk)
+            self.checkboxes.insert(index, (pdf_path, var, display_name))
+    
+    def finalizar_busca(self, pasta):
+        """Replace the scan status with the final result."""
+        self.scan_status_frame.destroy()
+        self.scan_status_frame = None
+        self.scan_status_label = None
+        self.scan_cancel_event = None
+        print(f"Total de PDFs encontrados: {len(self.folder_paths)}")
+        
+        if len(self.folder_paths) >= self.FOLDER_SCAN_MAX_FILES:
+            limit_label = ctk.CTkLabel(
+                self.frame_pdfs,
+                text=f"⚠️ Mostrando os primeiros {self.FOLDER_SCAN_MAX_FILES} PDFs encontrados",
+                font=ctk.CTkFont(size=11),
+                text_color="orange"
+            )
+            limit_label.pack(anchor="w", padx=10, pady=(5, 0), before=self.folder_widgets[0])
         
-        # Update the frame to ensure it's visible
-        self.frame_pdfs.update_idletasks()
+        if not self.folder_paths:
+            no_pdfs_label = ctk.CTkLabel(
+                self.frame_pdfs,
+                text="❌ Nenhum PDF encontrado nesta pasta.",
+                font=ctk.CTkFont(size=14),
+                text_color="red"
+            )
+            no_pdfs_label.pack(pady=20)
+            
+            # Debug info
+            debug_label = ctk.CTkLabel(
+                self.frame_pdfs,
+                text=f"📁 Pasta verificada: {pasta}",
+                font=ctk.CTkFont(size=10),
+                text_color="gray"
+            )
+            debug_label.pack(pady=5)
         
     def listar_arquivos_individuais(self):
-        """List individually selected PDF files with drag-sortable interface."""
-        print("=== INICIANDO LISTAGEM DE ARQUIVOS INDIVIDUAIS ===")
-        
-        # Clear existing widgets safely
-        try:
-            for widget in self.frame_pdfs.winfo_children():
-                widget.destroy()
-        except Exception as e:
-            print(f"Erro ao limpar widgets: {e}")
-        
-        self.file_items = []  # Lista para armazenar widgets dos arquivos
-        
-        # Force update to ensure widgets are cleared
-        self.frame_pdfs.update_idletasks()
+        """List individually selected PDF files in the virtualized, drag-sortable list."""
+        if not self.virtual_list_exists():
+            self.create_virtual_list()
         
         if not self.individual_files:
-            print("Nenhum arquivo individual selecionado")
             # Ocultar botões de seleção quando não há arquivos
             self.selection_frame.pack_forget()
-            
-            no_files_label = ctk.CTkLabel(
-                self.frame_pdfs,
-                text="📄 Use a área de drag & drop acima para adicionar PDFs",
-                font=ctk.CTkFont(size=14),
-                text_color="gray"
-            )
-            no_files_label.pack(pady=20)
+            self.list_instruction_label.pack_forget()
+            self.virtual_list.pack_forget()
+            self.list_empty_label.pack(pady=20)
+            self.list_offset = 0
+            self.render_visible_rows()
             return
         
-        # Mostrar apenas botão de limpar (versão minimalista)
-        self.create_minimal_controls()
-            
-        print(f"Criando lista drag-sortable para {len(self.individual_files)} arquivos")
+        # Mostrar apenas a instrução (versão minimalista)
+        self.list_empty_label.pack_forget()
+        if not self.virtual_list.winfo_manager():
+            self.list_instruction_label.pack(pady=(15, 20))  # Mais whitespace
+            self.virtual_list.pack(fill="x", padx=(8, 4), pady=(0, 6))
         
-        # Create drag-sortable list items
-        for i, file_info in enumerate(self.individual_files):
-            # Compatibilidade com formato antigo e novo
-            if len(file_info) == 2:
-                pdf_path, display_name = file_info
-                page_count = 0
-                is_valid = True
-            else:
-                pdf_path, display_name, page_count, is_valid = file_info
-            
-            # Criar item da lista minimalista
-            file_item = self.create_file_item(i, pdf_path, display_name, page_count)
-            self.file_items.append(file_item)
-                
-        print(f"=== LISTAGEM DRAG-SORTABLE COMPLETA: {len(self.file_items)} PDFs ===")
-        
-        # Update the frame to ensure it's visible
-        self.frame_pdfs.update_idletasks()
+        self.render_visible_rows()
+    
+    def render_visible_rows(self):
+        """Bind the visible slice of individual_files to the pooled row widgets."""
+        total = len(self.individual_files)
+        max_offset = max(0, total - len(self.row_pool))
+        self.list_offset = min(max(0, self.list_offset), max_offset)
+        
+        visible_rows = []
+        for slot, row in enumerate(self.row_pool):
+            index = self.list_offset + slot
+            if index < total:
+                self.configure_file_row(row, index)
+                if not row.is_visible:
+                    # Linhas ocultas estão sempre no fim, então a ordem se mantém
+                    row.pack(fill="x", padx=(0, 4), pady=1)
+                    row.is_visible = True
+                visible_rows.append(row)
+            elif row.is_visible:
+                row.pack_forget()
+                row.is_visible = False
+        
+        self.file_items = visible_rows
+        
+        if total > 0:
+            first = self.list_offset / total
+            last = min(1.0, (self.list_offset + len(self.row_pool)) / total)
+        else:
+            first, last = 0.0, 1.0
+        self.list_scrollbar.set(first, last)
+    
+    def scroll_file_list(self, rows):
+        """Scroll the virtualized list by a number of rows."""
+        self.list_offset += rows
+        self.render_visible_rows()
+    
+    def on_list_scrollbar(self, *args):
+        """Handle scrollbar commands ('moveto', fraction) or ('scroll', n, what)."""
+        total = len(self.individual_files)
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.list_offset = int(round(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                amount *= len(self.row_pool)
+            self.list_offset += amount
+        self.render_visible_rows()
+    
+    def on_list_mouse_wheel(self, event):
+        """Scroll the virtualized list with the mouse wheel."""
+        if getattr(event, "num", None) == 4:
+            rows = -1
+        elif getattr(event, "num", None) == 5:
+            rows = 1
+        else:
+            rows = -1 if event.delta > 0 else 1
+        self.scroll_file_list(rows)
+        return "break"  # Não rolar também a janela principal
+    
+    def bind_list_mouse_wheel(self, widget):
+        """Bind mouse wheel scrolling of the list to a widget and its children."""
+        if sys.platform.startswith("linux"):
+            sequences = ["<Button-4>", "<Button-5>"]
+        else:
+            sequences = ["<MouseWheel>"]
+        for sequence in sequences:
+            widget.bind(sequence, self.on_list_mouse_wheel)
+        for child in widget.winfo_children():
+            self.bind_list_mouse_wheel(child)
     
-    def create_file_item(self, index, pdf_path, display_name, page_count):
-        """Create a clean, minimal file item."""
+    def create_file_row(self):
+        """Create a clean, minimal, recyclable file row."""
         # Frame principal - ainda mais compacto
         item_frame = ctk.CTkFrame(
-            self.frame_pdfs, 
+            self.list_rows, 
             corner_radius=6,
             height=36,  # Mais compacto ainda
             fg_color=("gray97", "gray13"),
             border_width=1,
             border_color=("gray85", "gray25")
         )
-        item_frame.pack(fill="x", padx=8, pady=1)  # Padding mínimo
         item_frame.pack_propagate(False)
+        item_frame.is_visible = False
         
         # Container interno - mais compacto
         content_frame = ctk.CTkFrame(item_frame, fg_color="transparent")
         content_frame.pack(fill="both", expand=True, padx=12, pady=6)  # Padding reduzido
         
-        # Nome do arquivo com contagem de páginas - responsivo
-        if page_count > 0:
-            file_text = f"{display_name} ({page_count} página{'s' if page_count != 1 else ''})"
-        else:
-            file_text = display_name
-            
         name_label = ctk.CTkLabel(
             content_frame,
-            text=file_text,
+            text="",
             font=ctk.CTkFont(size=11),
             anchor="w",
             text_color=("gray20", "gray80"),
@@ -1417,14 +1938,6 @@ class PDFMergerApp:
         )
         name_label.pack(side="left", fill="x", expand=True)
         
-        # Store original text for responsive truncation
-        name_label.original_text = file_text
-        name_label.display_name = display_name
-        name_label.page_count = page_count
-        
-        # Force immediate responsive update
-        self.root.after_idle(lambda: self.update_single_item_responsive(name_label))
-        
         # Ícone de drag sutil
         drag_icon = ctk.CTkLabel(
             content_frame,
@@ -1435,26 +1948,73 @@ class PDFMergerApp:
         )
         drag_icon.pack(side="right")
         
-        # Configurações de interação
+        # Referências - preenchidas por configure_file_row
+        item_frame.pdf_path = ""
+        item_frame.index = -1
+        item_frame.display_name = ""
+        item_frame.page_count = 0
+        item_frame.page_range = ""
+        item_frame.name_label = name_label  # Reference for responsive updates
+        
+        # Configurações de interação (leem o arquivo atual da linha no evento)
         if DRAG_DROP_AVAILABLE:
-            self.setup_item_drag_drop(item_frame, index)
+            self.setup_item_drag_drop(item_frame)
         
-        self.setup_context_menu(item_frame, pdf_path, display_name, index)
+        self.setup_context_menu(item_frame)
         
         # Hover tooltip shows full filename and path for truncated items
-        tooltip_text = f"{display_name}"
-        if page_count > 0:
-            tooltip_text += f"\n{page_count} página{'s' if page_count != 1 else ''}"
-        tooltip_text += f"\nCaminho: {pdf_path}"
-        self.setup_hover_tooltip(item_frame, tooltip_text)
+        self.setup_hover_tooltip(item_frame, lambda: self.get_file_tooltip_text(item_frame))
+        self.bind_list_mouse_wheel(item_frame)
+        
+        return item_frame
+    
+    def configure_file_row(self, item_frame, index):
+        """Show individual_files[index] in a pooled row widget."""
+        file_info = self.individual_files[index]
+        # Compatibilidade com formato antigo e novo
+        if len(file_info) == 2:
+            pdf_path, display_name = file_info
+            page_count = 0
+        else:
+            pdf_path, display_name, page_count = file_info[:3]
+        page_range = file_info[4] if len(file_info) >= 5 else ""
         
-        # Referências
-        item_frame.pdf_path = pdf_path
         item_frame.index = index
+        if (item_frame.pdf_path == pdf_path and item_frame.page_count == page_count
+                and item_frame.page_range == page_range):
+            return  # Linha já mostra este arquivo
+        
+        item_frame.pdf_path = pdf_path
         item_frame.display_name = display_name
-        item_frame.name_label = name_label  # Reference for responsive updates
+        item_frame.page_count = page_count
+        item_frame.page_range = page_range
         
-        return item_frame
+        # Nome do arquivo com contagem de páginas - responsivo
+        if page_range:
+            selected_pages = self.get_selected_page_count(file_info)
+            file_text = f"{display_name} (págs. {page_range} • {selected_pages} de {page_count})"
+        elif page_count > 0:
+            file_text = f"{display_name} ({page_count} página{'s' if page_count != 1 else ''})"
+        else:
+            file_text = display_name
+        
+        # Store original text for responsive truncation
+        name_label = item_frame.name_label
+        name_label.original_text = file_text
+        name_label.display_name = display_name
+        name_label.page_count = self.get_selected_page_count(file_info)
+        name_label.configure(text=file_text)
+        self.update_single_item_responsive(name_label)
+    
+    def get_file_tooltip_text(self, item_frame):
+        """Build the hover tooltip for the file currently shown in a row."""
+        tooltip_text = f"{item_frame.display_name}"
+        if item_frame.page_count > 0:
+            tooltip_text += f"\n{item_frame.page_count} página{'s' if item_frame.page_count != 1 else ''}"
+        if item_frame.page_range:
+            tooltip_text += f"\nPáginas selecionadas: {item_frame.page_range}"
+        tooltip_text += f"\nCaminho: {item_frame.pdf_path}"
+        return tooltip_text
     
     def update_single_item_responsive(self, name_label):
         """Update a single item for responsive display immediately."""
@@ -1575,12 +2135,12 @@ class PDFMergerApp:
                             truncated_text = f"{display_name[:15]}..."
                         name_label.configure(text=truncated_text)
     
-    def setup_item_drag_drop(self, item_frame, index):
+    def setup_item_drag_drop(self, item_frame):
         """Setup drag and drop for list item reordering."""
         try:
             # Função para aplicar eventos a um widget e seus filhos
             def bind_drag_events(widget):
-                widget.bind("<Button-1>", lambda e: self.start_drag(e, item_frame, index))
+                widget.bind("<Button-1>", lambda e: self.start_drag(e, item_frame, item_frame.index))
                 widget.bind("<B1-Motion>", lambda e: self.on_drag_motion(e, item_frame))
                 widget.bind("<ButtonRelease-1>", lambda e: self.end_drag(e, item_frame))
                 widget.bind("<Enter>", lambda e: self.on_drag_enter_item(e, item_frame))
@@ -1601,12 +2161,16 @@ class PDFMergerApp:
         except Exception as e:
             print(f"Erro ao configurar drag-drop do item: {e}")
     
-    def setup_context_menu(self, widget, pdf_path, display_name, index):
+    def setup_context_menu(self, widget):
         """Setup right-click context menu for file operations with native Tk Menu (better on Windows)."""
         def show_context_menu(event):
+            # Linhas são recicladas - ler o arquivo atual no momento do clique
+            pdf_path = widget.pdf_path
+            index = widget.index
             # Usar menu nativo do Tk para máxima compatibilidade (especialmente no Windows)
             menu = Menu(self.root, tearoff=0)
             menu.add_command(label="❌ Remover", command=lambda: self.context_remove_file(None, pdf_path))
+            menu.add_command(label="📄 Selecionar Páginas...", command=lambda: self.context_edit_page_range(pdf_path))
             menu.add_separator()
             menu.add_command(label="⬆️ Mover para Topo", command=lambda: self.context_move_to_top(None, index))
             menu.add_command(label="⬇️ Mover para Fim", command=lambda: self.context_move_to_bottom(None, index))
@@ -1636,8 +2200,9 @@ class PDFMergerApp:
                     grandchild.bind(sequence, show_context_menu)
     
     def setup_hover_tooltip(self, widget, tooltip_text):
-        """Setup hover tooltip to show file details."""
+        """Setup hover tooltip to show file details (text may be a callable)."""
         def show_tooltip(event):
+            text = tooltip_text() if callable(tooltip_text) else tooltip_text
             # Criar tooltip
             self.tooltip = ctk.CTkToplevel()
             self.tooltip.withdraw()
@@ -1646,7 +2211,7 @@ class PDFMergerApp:
             
             tooltip_label = ctk.CTkLabel(
                 self.tooltip,
-                text=tooltip_text,
+                text=text,
                 font=ctk.CTkFont(size=10),
                 text_color=("black", "white")
             )
@@ -1668,10 +2233,38 @@ class PDFMergerApp:
         
     def remover_arquivo_individual(self, pdf_path):
         """Remove an individual file from the list."""
-        self.individual_files = [file_info for file_info in self.individual_files if file_info[0] != pdf_path]
+        index = next((i for i, file_info in enumerate(self.individual_files) if file_info[0] == pdf_path), None)
+        if index is None:
+            return
+        self.individual_files.pop(index)
         self.atualizar_interface_com_arquivos()
         self.atualizar_info_section()
-        self.listar_arquivos_individuais()
+        
+        if self.individual_files and self.virtual_list_exists():
+            # Só as linhas a partir do removido mudam; as anteriores são mantidas
+            self.render_visible_rows()
+        else:
+            self.listar_arquivos_individuais()
+    
+    def mover_arquivo(self, old_index, new_index):
+        """Move a file in the list and re-label only the rows that changed."""
+        file_info = self.individual_files.pop(old_index)
+        self.individual_files.insert(new_index, file_info)
+        self.atualizar_linhas(min(old_index, new_index), max(old_index, new_index))
+    
+    def atualizar_linhas(self, start, end):
+        """
+        Refresh the visible rows showing files start..end (inclusive).
+        
+        A reorder only shifts the files between the old and new positions, so
+        rows outside that range are left untouched.
+        """
+        if not self.virtual_list_exists():
+            self.listar_arquivos_individuais()
+            return
+        for row in self.file_items:
+            if start <= row.index <= end:
+                self.configure_file_row(row, row.index)
     
     # Context menu actions
     def context_remove_file(self, menu=None, pdf_path=None):
@@ -1692,9 +2285,7 @@ class PDFMergerApp:
         except Exception:
             pass
         if index is not None and index > 0:
-            file_info = self.individual_files.pop(index)
-            self.individual_files.insert(0, file_info)
-            self.listar_arquivos_individuais()
+            self.mover_arquivo(index, 0)
     
     def context_move_to_bottom(self, menu=None, index=None):
         """Move file to bottom via context menu."""
@@ -1704,9 +2295,48 @@ class PDFMergerApp:
         except Exception:
             pass
         if index is not None and index < len(self.individual_files) - 1:
-            file_info = self.individual_files.pop(index)
-            self.individual_files.append(file_info)
-            self.listar_arquivos_individuais()
+            self.mover_arquivo(index, len(self.individual_files) - 1)
+    
+    def context_edit_page_range(self, pdf_path):
+        """Ask for the pages of one file to merge, e.g. "1-3,7,10-" (empty = all)."""
+        from tkinter import simpledialog
+        
+        index = next((i for i, file_info in enumerate(self.individual_files) if file_info[0] == pdf_path), None)
+        if index is None or self.is_merging:
+            return
+        file_info = self.individual_files[index]
+        page_range = file_info[4] if len(file_info) >= 5 else ""
+        
+        new_range = simpledialog.askstring(
+            "Selecionar Páginas",
+            f"Páginas de '{file_info[1]}' a juntar (ex.: 1-3,7,10-).\nDeixe vazio para todas:",
+            initialvalue=page_range
+        )
+        if new_range is None:
+            return  # Cancelado
+        new_range = new_range.replace(" ", "")
+        
+        try:
+            selected_pages = parse_page_ranges(new_range, file_info[2])
+        except ValueError as e:
+            messagebox.showwarning("Selecionar Páginas", str(e))
+            return
+        if new_range and file_info[2] > 0 and not selected_pages:
+            messagebox.showwarning("Selecionar Páginas",
+                                   f"Nenhuma página do intervalo existe em '{file_info[1]}'.")
+            return
+        
+        self.individual_files[index] = (file_info[0], file_info[1], file_info[2], True, new_range)
+        self.render_visible_rows()
+        self.atualizar_info_section()
+    
+    def get_selected_page_count(self, file_info):
+        """Number of pages a file contributes, honouring its page range."""
+        page_count = file_info[2] if len(file_info) >= 3 else 0
+        page_range = file_info[4] if len(file_info) >= 5 else ""
+        if not page_range:
+            return page_count
+        return len(parse_page_ranges(page_range, page_count))
     
     # Drag and drop for reordering (improved implementation)
     def start_drag(self, event, item_frame, index):
@@ -1727,6 +2357,9 @@ class PDFMergerApp:
     def on_drag_motion(self, event, item_frame):
         """Handle drag motion with better target detection."""
         if hasattr(self, 'drag_data'):
+            # Rolar a lista virtualizada ao arrastar além das bordas
+            self.autoscroll_during_drag(event.y_root)
+            
             # Encontrar o item sobre o qual estamos arrastando
             target_item = self.find_item_at_position(event.x_root, event.y_root)
             
@@ -1745,6 +2378,23 @@ class PDFMergerApp:
                     border_color=("green", "lightgreen")
                 )
     
+    def autoscroll_during_drag(self, y_root):
+        """Scroll one row when dragging above or below the visible rows."""
+        now = time.monotonic()
+        if (now - self.list_last_autoscroll) * 1000 < self.LIST_AUTOSCROLL_MS:
+            return
+        try:
+            top = self.list_rows.winfo_rooty()
+            bottom = top + self.list_rows.winfo_height()
+        except Exception:
+            return
+        if y_root < top:
+            self.list_last_autoscroll = now
+            self.scroll_file_list(-1)
+        elif y_root > bottom:
+            self.list_last_autoscroll = now
+            self.scroll_file_list(1)
+    
     def find_item_at_position(self, x, y):
         """Find which item is at the given screen coordinates."""
         for file_item in self.file_items:
@@ -1778,20 +2428,13 @@ class PDFMergerApp:
             if target_item and target_item != self.drag_data['item']:
                 # Encontrar índices
                 old_index = self.drag_data['index']
-                new_index = None
+                # Linhas recicladas guardam o índice do arquivo que mostram
+                new_index = target_item.index
                 
-                for i, file_item in enumerate(self.file_items):
-                    if file_item == target_item:
-                        new_index = i
-                        break
-                
-                if new_index is not None and new_index != old_index:
+                if 0 <= new_index < len(self.individual_files) and new_index != old_index:
                     print(f"Movendo item de {old_index} para {new_index}")
-                    # Reordenar na lista de dados
-                    file_info = self.individual_files.pop(old_index)
-                    self.individual_files.insert(new_index, file_info)
-                    # Atualizar interface
-                    self.listar_arquivos_individuais()
+                    # Reordenar e atualizar só as linhas afetadas
+                    self.mover_arquivo(old_index, new_index)
             
             # Resetar cores de todos os itens
             for file_item in self.file_items:
@@ -1816,17 +2459,13 @@ class PDFMergerApp:
         """Move file up in the list."""
         if index > 0 and index < len(self.individual_files):
             # Trocar posições
-            self.individual_files[index], self.individual_files[index-1] = \
-                self.individual_files[index-1], self.individual_files[index]
-            self.listar_arquivos_individuais()
+            self.mover_arquivo(index, index - 1)
             
     def mover_arquivo_baixo(self, index):
         """Move file down in the list."""
         if index >= 0 and index < len(self.individual_files) - 1:
             # Trocar posições
-            self.individual_files[index], self.individual_files[index+1] = \
-                self.individual_files[index+1], self.individual_files[index]
-            self.listar_arquivos_individuais()
+            self.mover_arquivo(index, index + 1)
             
     def selecionar_todos(self):
         """Select all PDF files (legacy compatibility)."""
@@ -1842,8 +2481,17 @@ class PDFMergerApp:
         """Clear all individual files and folder selection."""
         if messagebox.askyesno("Confirmar", "Deseja limpar toda a lista de arquivos?"):
             self.individual_files.clear()
+            # Descartar validações ainda em andamento
+            for pendente in self.validation_pending:
+                pendente[1].cancel()
+            self.validation_pending.clear()
+            self.validation_added = 0
+            self.validation_invalid = []
             self.pasta_var.set("")
             self.checkboxes.clear()
+            self.folder_paths = []
+            self.folder_widgets = []
+            self.cancelar_busca()  # Parar uma busca em andamento
             
             # Limpar widgets da lista
             try:
@@ -1851,6 +2499,8 @@ class PDFMergerApp:
                     widget.destroy()
             except Exception as e:
                 print(f"Erro ao limpar widgets: {e}")
+            self.file_items = []
+            self.list_offset = 0
             
             # Voltar ao estado inicial da interface
             self.atualizar_interface_com_arquivos()
@@ -1865,164 +2515,274 @@ class PDFMergerApp:
             )
             info_label.pack(pady=20)
             
-    def update_progress(self, current: int, total: int, message: str = ""):
-        """Update progress bar and label."""
-        progress = current / total if total > 0 else 0
-        self.progress_bar.set(progress)
+    def update_progress(self, current: int, total: int, message: str = "",
+                        pages_done: int = 0, bytes_read: int = 0):
+        """
+        Report merge progress from any thread.
+        
+        Only publishes to the progress channel; widgets are updated by
+        poll_progress on the Tk loop, so the merge thread never waits on the GUI.
+        """
+        self.progress_channel.report(current, total, message, pages_done, bytes_read)
+        
+    def poll_progress(self):
+        """Apply the latest reported progress to the widgets (runs on the Tk loop)."""
+        progress = self.progress_channel.poll()
+        if progress is not None:
+            current, total = progress["current"], progress["total"]
+            self.progress_bar.set(current / total if total > 0 else 0)
+            
+            text = progress["message"] or f"Processando: {current}/{total} PDFs"
+            if progress["pages_per_sec"] > 0:
+                text += f" • {progress['pages_per_sec']:.0f} pág/s"
+            if progress["bytes_per_sec"] > 0:
+                text += f" • {progress['bytes_per_sec'] / (1024 * 1024):.1f} MB/s"
+            self.progress_label.configure(text=text)
+        
+        if self.merge_outcome is None:
+            self.root.after(1000 // self.PROGRESS_UPDATES_PER_SECOND, self.poll_progress)
+            return
         
-        if message:
-            self.progress_label.configure(text=message)
+        # Junção terminou: só aqui, depois de ler o resultado, outra junção pode começar
+        job, outcome = self.merge_outcome
+        self.merge_outcome = None
+        self.is_merging = False
+        self.merge_cancel_event = None
+        self.merge_thread = None
+        self.btn_juntar.configure(state="normal", text="🚀 Juntar PDFs", command=self.juntar_pdfs_threaded)
+        self.progress_bar.set(0)
+        kind = outcome[0] if outcome else None
+        if kind == "ok":
+            # Manter a mensagem de sucesso visível antes de voltar ao estado inicial
+            self.progress_label.configure(text="✅ PDFs unidos com sucesso!")
+            self.progress_reset_after = self.root.after(self.SUCCESS_MESSAGE_MS, self.reset_progress_label)
         else:
-            self.progress_label.configure(text=f"Processando: {current}/{total} PDFs")
-            
-        self.root.update_idletasks()
+            self.progress_label.configure(text="Junção cancelada" if kind == "cancelled" else "Pronto para juntar PDFs")
+        self.concluir_juncao(job, outcome)
+        
+    def reset_progress_label(self):
+        """Return the progress label to its idle text after a success message."""
+        self.progress_reset_after = None
+        if not self.is_merging:
+            self.progress_label.configure(text="Pronto para juntar PDFs")
         
     def juntar_pdfs_threaded(self):
-        """Start PDF merging in a separate thread."""
+        """Validate the merge on the Tk loop and run it in a separate thread."""
         if self.is_merging:
             return
-            
-        thread = threading.Thread(target=self.juntar_pdfs, daemon=True)
-        thread.start()
         
-    def juntar_pdfs(self):
-        """Merge selected PDF files with progress tracking."""
+        # Diálogos e variáveis do Tk só são usados aqui; o worker recebe valores simples
+        job = self.preparar_juncao()
+        if job is None:
+            return
+        
+        # Estado dos widgets é alterado aqui, no loop do Tk, e não no worker
+        self.is_merging = True
+        self.merge_outcome = None
+        if self.progress_reset_after is not None:
+            self.root.after_cancel(self.progress_reset_after)
+            self.progress_reset_after = None
+        self.merge_cancel_event = threading.Event()
+        self.btn_juntar.configure(text="⏹ Cancelar Junção", command=self.cancelar_juntar)
+        self.progress_channel.reset()
+        
+        self.merge_thread = threading.Thread(target=self.juntar_pdfs, args=(job,), daemon=True)
+        self.merge_thread.start()
+        self.root.after(1000 // self.PROGRESS_UPDATES_PER_SECOND, self.poll_progress)
+        
+    def cancelar_juntar(self):
+        """Ask the running merge to stop at its next page or file boundary."""
+        if self.is_merging and self.merge_cancel_event is not None:
+            self.merge_cancel_event.set()
+            self.btn_juntar.configure(state="disabled", text="⏳ Cancelando...")
+        
+    def preparar_juncao(self):
+        """
+        Collect and validate everything the merge needs (runs on the Tk loop).
+        
+        Returns:
+            Dict of plain values for juntar_pdfs, or None if the user must fix
+            something first or declined to overwrite the output
+        """
+        # Na nova interface, todos os arquivos estão selecionados por padrão
+        if hasattr(self, 'checkboxes') and self.checkboxes:
+            # Modo legado com checkboxes
+            selecionados = [(pdf_path, display_name) for pdf_path, var, display_name in self.checkboxes if var.get()]
+        else:
+            # Novo modo minimalista - todos os arquivos
+            selecionados = [(file_info[0], file_info[1]) for file_info in self.individual_files]
+        
+        if not selecionados:
+            messagebox.showwarning("Aviso", "Nenhum PDF para juntar.")
+            return None
+            
+        # Intervalos por arquivo; as demais páginas nem chegam a ser lidas
+        page_ranges = {file_info[0]: file_info[4] for file_info in self.individual_files
+                       if len(file_info) >= 5 and file_info[4]}
+            
+        # Validate filename
+        nome_final = self.nome_var.get().strip()
+        is_valid, error_msg = self.validate_filename(nome_final)
+        
+        if not is_valid:
+            messagebox.showwarning("Nome Inválido", error_msg)
+            return None
+            
+        if not nome_final.endswith(".pdf"):
+            nome_final += ".pdf"
+            
+        # Create output file path
+        output_dir = self.output_dir_var.get() or self.get_default_output_directory()
+        ficheiro_saida = os.path.join(output_dir, nome_final)
+        split_mb = self.SPLIT_SIZE_LABELS[self.split_size_var.get()]
+        
+        # Check if file already exists
+        if split_mb:
+            # Com divisão, a saída é nome_001.pdf, nome_002.pdf... e partes excedentes são apagadas
+            partes_existentes = find_split_parts(ficheiro_saida)
+            if partes_existentes and not messagebox.askyesno(
+                "Arquivo Existe",
+                f"Já existem {len(partes_existentes)} partes de '{nome_final}'.\n"
+                f"Deseja substituí-las?"
+            ):
+                return None
+        elif os.path.exists(ficheiro_saida):
+            if not messagebox.askyesno(
+                "Arquivo Existe",
+                f"O arquivo '{nome_final}' já existe.\nDeseja substituí-lo?"
+            ):
+                return None
+        
+        merge_options = {}
+        if split_mb:
+            # Cada parte é gravada em streaming, seja qual for o modo escolhido
+            merge_function = merge_pdfs_split
+            merge_options["max_bytes"] = split_mb * 1024 * 1024
+        elif self.merge_mode_var.get() == "Streaming":
+            merge_function = merge_pdfs_streaming
+        elif self.merge_mode_var.get() == "Árvore":
+            # Partes juntadas em paralelo; indicado para milhares de arquivos
+            merge_function = merge_pdfs_tree
+        else:
+            merge_function = merge_pdfs_in_memory
+        
+        return {
+            "paths": [pdf_path for pdf_path, _ in selecionados],
+            "output": ficheiro_saida,
+            "page_ranges": page_ranges,
+            "split_mb": split_mb,
+            "merge_function": merge_function,
+            "merge_options": merge_options,
+            "profile": self.OUTPUT_PROFILE_LABELS[self.output_profile_var.get()],
+            "optimize_images": self.optimize_images_var.get(),
+            "auto_merge": self.auto_merge_var.get(),
+            "auto_open": self.auto_open_var.get(),
+            "show_feedback": self.show_feedback_var.get(),
+        }
+        
+    def juntar_pdfs(self, job):
+        """
+        Merge the PDFs of a job from preparar_juncao (runs in a worker thread).
+        
+        Touches no widget or Tk variable: progress goes through the progress
+        channel and the outcome is left in merge_outcome for poll_progress,
+        which also clears is_merging once it has read it.
+        """
+        outcome = None
         try:
-            self.is_merging = True
-            self.btn_juntar.configure(state="disabled", text="🔄 Juntando PDFs...")
-            
-            # Na nova interface, todos os arquivos estão selecionados por padrão
-            if hasattr(self, 'checkboxes') and self.checkboxes:
-                # Modo legado com checkboxes
-                selecionados = [(pdf_path, display_name) for pdf_path, var, display_name in self.checkboxes if var.get()]
-            else:
-                # Novo modo minimalista - todos os arquivos
-                selecionados = [(file_info[0], file_info[1]) for file_info in self.individual_files]
-            
-            if not selecionados:
-                messagebox.showwarning("Aviso", "Nenhum PDF para juntar.")
-                return
-                
-            # Calcular total de páginas (se disponível)
-            total_pages = 0
-            for pdf_path, _ in selecionados:
-                # Procurar nas informações dos arquivos individuais
-                for file_info in self.individual_files:
-                    if len(file_info) >= 3 and file_info[0] == pdf_path:
-                        total_pages += file_info[2]  # page_count
-                        break
-                
-            # Validate filename
-            nome_final = self.nome_var.get().strip()
-            is_valid, error_msg = self.validate_filename(nome_final)
-            
-            if not is_valid:
-                messagebox.showwarning("Nome Inválido", error_msg)
-                return
-                
-            if not nome_final.endswith(".pdf"):
-                nome_final += ".pdf"
-                
-            # Create output file path
-            output_dir = self.output_dir_var.get() or self.get_default_output_directory()
-            ficheiro_saida = os.path.join(output_dir, nome_final)
-            
-            # Check if file already exists
-            if os.path.exists(ficheiro_saida):
-                if not messagebox.askyesno(
-                    "Arquivo Existe",
-                    f"O arquivo '{nome_final}' já existe.\nDeseja substituí-lo?"
-                ):
-                    return
-                    
-            # Initialize progress
-            total_pdfs = len(selecionados)
+            total_pdfs = len(job["paths"])
             self.update_progress(0, total_pdfs, "Iniciando junção de PDFs...")
             
-            # Merge PDFs
+            # Merge PDFs - sem pausas artificiais; a barra é atualizada por poll_progress
+            image_optimizer = None
+            if job["optimize_images"]:
+                image_optimizer = ImageOptimizer(target_dpi=self.IMAGE_TARGET_DPI)
             try:
-                from pypdf import PdfReader, PdfWriter
-                merger = PdfWriter()
-                
-                for i, (pdf_path, display_name) in enumerate(selecionados):
-                    try:
-                        self.update_progress(i, total_pdfs, f"Adicionando: {display_name}")
-                        reader = PdfReader(pdf_path)
-                        for page in reader.pages:
-                            merger.add_page(page)
-                        time.sleep(0.1)  # Small delay for visual feedback
-                        
-                    except Exception as e:
-                        messagebox.showerror(
-                            "Erro no PDF",
-                            f"Erro ao processar '{display_name}':\n{str(e)}\n\nO PDF pode estar corrompido ou protegido por senha."
-                        )
-                        return
-                        
-                # Write final file
-                self.update_progress(total_pdfs, total_pdfs, "Salvando arquivo final...")
-                with open(ficheiro_saida, 'wb') as output_file:
-                    merger.write(output_file)
-                    
-            except ImportError:
-                # Fallback to older PyPDF2 or pypdf versions
-                merger = PdfMerger()
-                
-                for i, (pdf_path, display_name) in enumerate(selecionados):
-                    try:
-                        self.update_progress(i, total_pdfs, f"Adicionando: {display_name}")
-                        merger.append(pdf_path)
-                        time.sleep(0.1)  # Small delay for visual feedback
-                        
-                    except Exception as e:
-                        messagebox.showerror(
-                            "Erro no PDF",
-                            f"Erro ao processar '{display_name}':\n{str(e)}\n\nO PDF pode estar corrompido ou protegido por senha."
-                        )
-                        merger.close()
-                        return
-                        
-                # Write final file
-                self.update_progress(total_pdfs, total_pdfs, "Salvando arquivo final...")
-                merger.write(ficheiro_saida)
-                merger.close()
-            
-            # Success
-            self.progress_bar.set(1.0)
-            self.progress_label.configure(text="✅ PDFs unidos com sucesso!")
-            
-            # Mensagem de sucesso com informações detalhadas
-            success_msg = f"PDF criado com sucesso!\n\n📁 Local: {ficheiro_saida}\n📊 {total_pdfs} PDFs unidos"
-            if total_pages > 0:
-                success_msg += f"\n📄 Total de páginas: {total_pages}"
-            
-            # Auto-abrir se habilitado, senão perguntar (apenas se feedback habilitado)
-            if self.auto_merge_var.get():
-                # No modo auto-merge, sempre abrir automaticamente
-                self.abrir_arquivo(ficheiro_saida)
-                if self.show_feedback_var.get():
-                    messagebox.showinfo("Auto-Merge Concluído", success_msg + "\n\n🚀 Arquivo aberto automaticamente!")
-            elif self.auto_open_var.get():
-                self.abrir_arquivo(ficheiro_saida)
-                if self.show_feedback_var.get():
-                    messagebox.showinfo("Sucesso", success_msg + "\n\n🚀 Arquivo aberto automaticamente!")
-            else:
-                # Sem popup por padrão - apenas se feedback habilitado
-                if self.show_feedback_var.get():
-                    if messagebox.askyesno(
-                        "Sucesso", 
-                        success_msg + "\n\nDeseja abrir o arquivo agora?",
-                        icon="question"
-                    ):
-                        self.abrir_arquivo(ficheiro_saida)
-                # Se feedback desabilitado, não mostrar popup nem abrir arquivo
-            
+                stats = job["merge_function"](
+                    job["paths"],
+                    job["output"],
+                    progress_callback=self.update_progress,
+                    profile=job["profile"],
+                    image_optimizer=image_optimizer,
+                    cancel_event=self.merge_cancel_event,
+                    page_ranges=job["page_ranges"],
+                    **job["merge_options"]
+                )
+            finally:
+                if image_optimizer is not None:
+                    image_optimizer.close()
+            
+            self.update_progress(total_pdfs, total_pdfs, "✅ PDFs unidos com sucesso!")
+            outcome = ("ok", stats)
+        except MergeCancelled:
+            # O motor já removeu o arquivo temporário; a saída anterior fica intacta
+            print(f"Junção cancelada: {job['output']}")
+            outcome = ("cancelled", None)
+        except PDFMergeError as e:
+            outcome = ("error", (
+                "Erro no PDF",
+                f"Erro ao processar '{os.path.basename(e.pdf_path)}':\n{str(e)}\n\nO PDF pode estar corrompido ou protegido por senha."
+            ))
+        except Exception as e:
+            outcome = ("error", ("Erro ao Juntar PDFs", f"Erro inesperado ao juntar os PDFs:\n{e}"))
         finally:
-            self.is_merging = False
-            self.btn_juntar.configure(state="normal", text="🚀 Juntar PDFs")
-            self.progress_bar.set(0)
-            self.progress_label.configure(text="Pronto para juntar PDFs")
+            # Sinal de término: poll_progress lê o resultado, libera is_merging e restaura os widgets
+            self.merge_outcome = (job, outcome)
             
+    def concluir_juncao(self, job, outcome):
+        """Show the result of a finished merge (runs on the Tk loop)."""
+        if outcome is None:
+            return
+        kind, data = outcome
+        if kind == "error":
+            messagebox.showerror(*data)
+            return
+        if kind != "ok":
+            return
+        
+        stats = data
+        ficheiro_saida = job["output"]
+        if job["split_mb"]:
+            ficheiro_saida = stats["parts"][0]["path"]  # Abrir a primeira parte
+        
+        # Mensagem de sucesso com informações detalhadas
+        success_msg = f"PDF criado com sucesso!\n\n📁 Local: {ficheiro_saida}\n📊 {stats['files']} PDFs unidos"
+        if stats["pages"] > 0:
+            success_msg += f"\n📄 Total de páginas: {stats['pages']}"
+        if job["split_mb"]:
+            success_msg += f"\n✂️ Dividido em {len(stats['parts'])} arquivos de até {job['split_mb']} MB"
+        if stats["skipped"]:
+            success_msg += f"\n⚠️ {len(stats['skipped'])} PDFs ignorados:"
+            for entry in stats["skipped"][:5]:
+                success_msg += f"\n   {os.path.basename(entry['path'])}: {entry['reason']}"
+        if stats["dedup_bytes_saved"] > 0:
+            success_msg += f"\n♻️ Recursos duplicados removidos: {stats['dedup_bytes_saved'] / (1024 * 1024):.1f} MB"
+        if stats["image_bytes_saved"] > 0:
+            success_msg += f"\n🖼️ Imagens otimizadas: {stats['image_bytes_saved'] / (1024 * 1024):.1f} MB a menos"
+        peak_memory = stats["peak_memory_mb"]
+        if peak_memory is not None:
+            success_msg += f"\n🧠 Pico de memória: {peak_memory:.0f} MB"
+        
+        # Auto-abrir se habilitado, senão perguntar (apenas se feedback habilitado)
+        if job["auto_merge"]:
+            # No modo auto-merge, sempre abrir automaticamente
+            self.abrir_arquivo(ficheiro_saida)
+            if job["show_feedback"]:
+                messagebox.showinfo("Auto-Merge Concluído", success_msg + "\n\n🚀 Arquivo aberto automaticamente!")
+        elif job["auto_open"]:
+            self.abrir_arquivo(ficheiro_saida)
+            if job["show_feedback"]:
+                messagebox.showinfo("Sucesso", success_msg + "\n\n🚀 Arquivo aberto automaticamente!")
+        else:
+            # Sem popup por padrão - apenas se feedback habilitado
+            if job["show_feedback"]:
+                if messagebox.askyesno(
+                    "Sucesso", 
+                    success_msg + "\n\nDeseja abrir o arquivo agora?",
+                    icon="question"
+                ):
+                    self.abrir_arquivo(ficheiro_saida)
+            # Se feedback desabilitado, não mostrar popup nem abrir arquivo
         
     def mostrar_ajuda(self):
         """Legacy help method - now redirects to modal tooltip."""
@@ -2159,4 +2919,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Necessário para o pool de validação em executáveis PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+PDF Probe
+=========
+Lightweight page counting for the SpeedConnect PDF Merger.
+
+Instead of building the full page tree, the probe memory-maps the file,
+reads the cross-reference data at its tail and resolves only
+/Root -> /Pages -> /Count. Callers fall back to a full parse whenever the
+probe returns None (broken xref, encrypted document, unusual layout).
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import mmap
+import re
+from typing import Dict, Optional, Tuple
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    from PyPDF2 import PdfReader
+
+
+TAIL_SIZE = 2048
+MAX_OBJECT_SIZE = 4 * 1024 * 1024
+MAX_XREF_SECTIONS = 64
+
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)")
+_SUBSECTION_RE = re.compile(rb"\s*(\d+)\s+(\d+)[ \t]*\r?\n?")
+_OBJ_HEADER_RE = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj")
+_ROOT_RE = re.compile(rb"/Root\s+(\d+)\s+(\d+)\s+R")
+_PREV_RE = re.compile(rb"/Prev\s+(\d+)")
+_PAGES_RE = re.compile(rb"/Pages\s+(\d+)\s+(\d+)\s+R")
+_TYPE_PAGES_RE = re.compile(rb"/Type\s*/Pages(?![A-Za-z])")
+_COUNT_RE = re.compile(rb"/Count\s+(\d+)(?:\s+(\d+)\s+R)?")
+
+
+class _ProbeFailed(Exception):
+    """Internal signal that the fast path cannot answer."""
+
+
+def probe_page_count(pdf_path: str) -> Optional[int]:
+    """
+    Get the page count of a PDF by reading only its trailer and page tree root.
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        The /Count of the root /Pages node, or None if a full parse is needed
+    """
+    try:
+        with open(pdf_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if not mm[:1024].lstrip().startswith(b"%PDF-"):
+                    return None
+                try:
+                    return _probe_classic_xref(mm)
+                except _ProbeFailed:
+                    return _probe_lazy_reader(mm)
+    except (OSError, ValueError):
+        # Arquivo vazio ou inacessível - a validação completa reporta o erro
+        return None
+
+
+def _find_startxref(mm: mmap.mmap) -> int:
+    tail_start = max(0, len(mm) - TAIL_SIZE)
+    tail = mm[tail_start:]
+    pos = tail.rfind(b"startxref")
+    if pos < 0:
+        raise _ProbeFailed("startxref não encontrado")
+    match = _STARTXREF_RE.match(tail, pos)
+    if not match:
+        raise _ProbeFailed("startxref inválido")
+    return int(match.group(1))
+
+
+def _read_xref_section(mm: mmap.mmap, offset: int) -> Tuple[Dict[int, int], bytes]:
+    """Parse a classic xref table, returning in-use offsets and the trailer text."""
+    if mm[offset:offset + 4] != b"xref":
+        raise _ProbeFailed("tabela xref clássica ausente")
+
+    offsets: Dict[int, int] = {}
+    pos = offset + 4
+    while True:
+        match = _SUBSECTION_RE.match(mm, pos)
+        if not match:
+            break
+        start, count = int(match.group(1)), int(match.group(2))
+        pos = match.end()
+        for number in range(start, start + count):
+            entry = mm[pos:pos + 20]
+            if len(entry) < 18:
+                raise _ProbeFailed("entrada xref truncada")
+            if entry[17:18] == b"n":
+                offsets[number] = int(entry[:10])
+            # Tolerar entradas de 19 ou 21 bytes de geradores fora da norma
+            pos += 18
+            while mm[pos:pos + 1] in (b" ", b"\r", b"\n"):
+                pos += 1
+
+    trailer_pos = mm.find(b"trailer", pos, pos + 64)
+    if trailer_pos < 0:
+        raise _ProbeFailed("trailer ausente")
+    trailer_end = mm.find(b"startxref", trailer_pos)
+    if trailer_end < 0:
+        trailer_end = min(len(mm), trailer_pos + TAIL_SIZE)
+    return offsets, mm[trailer_pos:trailer_end]
+
+
+def _read_object(mm: mmap.mmap, offsets: Dict[int, int], number: int) -> bytes:
+    offset = offsets.get(number)
+    if offset is None:
+        raise _ProbeFailed(f"objeto {number} fora da tabela xref")
+    match = _OBJ_HEADER_RE.match(mm, offset)
+    if not match or int(match.group(1)) != number:
+        raise _ProbeFailed(f"deslocamento inválido para o objeto {number}")
+    end = mm.find(b"endobj", match.end(), match.end() + MAX_OBJECT_SIZE)
+    if end < 0:
+        raise _ProbeFailed(f"objeto {number} sem endobj")
+    return mm[match.end():end]
+
+
+def _probe_classic_xref(mm: mmap.mmap) -> Optional[int]:
+    offset = _find_startxref(mm)
+    offsets: Dict[int, int] = {}
+    root_number = None
+
+    # Percorrer a cadeia /Prev; seções mais recentes têm prioridade
+    for _ in range(MAX_XREF_SECTIONS):
+        section_offsets, trailer = _read_xref_section(mm, offset)
+        for number, obj_offset in section_offsets.items():
+            offsets.setdefault(number, obj_offset)
+
+        if root_number is None:
+            if b"/Encrypt" in trailer:
+                return None
+            if b"/XRefStm" in trailer:
+                # Arquivo híbrido - objetos podem estar só no stream de xref
+                raise _ProbeFailed("xref híbrida")
+            root = _ROOT_RE.search(trailer)
+            if not root:
+                raise _ProbeFailed("trailer sem /Root")
+            root_number = int(root.group(1))
+
+        prev = _PREV_RE.search(trailer)
+        if not prev:
+            break
+        offset = int(prev.group(1))
+    else:
+        raise _ProbeFailed("cadeia /Prev longa demais")
+
+    catalog = _read_object(mm, offsets, root_number)
+    pages_ref = _PAGES_RE.search(catalog)
+    if not pages_ref:
+        raise _ProbeFailed("catálogo sem /Pages")
+
+    pages = _read_object(mm, offsets, int(pages_ref.group(1)))
+    if not _TYPE_PAGES_RE.search(pages):
+        raise _ProbeFailed("raiz da árvore de páginas inválida")
+    count = _COUNT_RE.search(pages)
+    if not count:
+        raise _ProbeFailed("árvore de páginas sem /Count")
+    if count.group(2) is not None:
+        # /Count indireto: "/Count 12 0 R"
+        value = _read_object(mm, offsets, int(count.group(1))).strip()
+        if not value.isdigit():
+            raise _ProbeFailed("/Count indireto inválido")
+        return int(value)
+    return int(count.group(1))
+
+
+def _probe_lazy_reader(mm: mmap.mmap) -> Optional[int]:
+    """
+    Resolve /Count through pypdf for xref streams.
+
+    PdfReader only loads the cross-reference data on construction; the page
+    tree is never flattened here, and only the catalog and the root /Pages
+    node (plus their object streams) are decoded.
+    """
+    try:
+        reader = PdfReader(mm)
+        if reader.is_encrypted:
+            return None
+        count = reader.trailer["/Root"]["/Pages"]["/Count"]
+        return int(count)
+    except Exception:
+        return None
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+PDF Scanner
+===========
+Directory scanning for the SpeedConnect PDF Merger.
+
+Uses os.scandir so file/directory checks come from the cached DirEntry
+type information (no extra stat() per entry on most platforms), and yields
+results in batches so a UI can show them while a large share is still
+being listed. Recursive scans can list several directories in parallel,
+which hides the per-request latency of network shares, and can be bounded
+by depth, by file count or cancelled from another thread.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple
+
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_SCAN_WORKERS = 8
+FLUSH_INTERVAL = 0.2  # Segundos até um lote parcial ser entregue
+
+
+def _scan_directory(directory: str) -> Tuple[List[str], List[str]]:
+    """
+    List one directory.
+
+    Returns:
+        Tuple of (pdf_paths, subdirectory_paths); unreadable entries are skipped
+    """
+    pdfs = []
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.pdf') and entry.is_file():
+                    pdfs.append(entry.path)
+            except OSError:
+                continue
+    return pdfs, subdirs
+
+
+def scan_pdf_files(
+    directory: str,
+    include_subfolders: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    max_depth: Optional[int] = None,
+    max_files: Optional[int] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Iterator[List[str]]:
+    """
+    Yield the PDF files under directory in batches, in no particular order.
+
+    A partial batch is flushed after FLUSH_INTERVAL seconds, so results from
+    a slow or sparse tree reach the caller while the walk continues.
+
+    Args:
+        directory: Directory path to search
+        include_subfolders: Whether to descend into subfolders
+        batch_size: Maximum number of paths per yielded batch
+        workers: Directories listed concurrently in recursive mode
+        max_depth: Deepest subfolder level to visit (1 = direct subfolders,
+            None = unlimited)
+        max_files: Stop after this many PDFs have been yielded
+        cancel_event: Stop as soon as this event is set
+
+    Yields:
+        Lists of PDF file paths
+
+    Raises:
+        NotADirectoryError: If directory does not exist or is not a directory
+        OSError: If the top-level directory cannot be read
+    """
+    if not os.path.isdir(directory):
+        raise NotADirectoryError(f"Diretório não existe ou não é válido: {directory}")
+
+    def should_descend(depth: int) -> bool:
+        return include_subfolders and (max_depth is None or depth < max_depth)
+
+    def cancelled() -> bool:
+        return cancel_event is not None and cancel_event.is_set()
+
+    remaining = max_files
+    batch: List[str] = []
+    last_flush = time.monotonic()
+
+    def take_ready(force: bool = False) -> List[str]:
+        """Remove and return the next batch to yield, or [] if none is due."""
+        nonlocal batch, remaining, last_flush
+        due = len(batch) >= batch_size or (batch and time.monotonic() - last_flush >= FLUSH_INTERVAL)
+        if not batch or not (force or due):
+            return []
+        ready, batch = batch[:batch_size], batch[batch_size:]
+        if remaining is not None:
+            ready = ready[:remaining]
+            remaining -= len(ready)
+        last_flush = time.monotonic()
+        return ready
+
+    def limit_reached() -> bool:
+        return remaining is not None and remaining <= 0
+
+    # A pasta raiz é lida aqui para que erros de acesso cheguem ao chamador
+    root_pdfs, root_subdirs = _scan_directory(directory)
+    batch.extend(root_pdfs)
+    pending_dirs = [(subdir, 1) for subdir in root_subdirs] if should_descend(0) else []
+
+    if workers <= 1 or not pending_dirs:
+        while True:
+            ready = take_ready()
+            while ready:
+                yield ready
+                if limit_reached() or cancelled():
+                    return
+                ready = take_ready()
+            if not pending_dirs or cancelled():
+                break
+            current, depth = pending_dirs.pop()
+            try:
+                pdfs, subdirs = _scan_directory(current)
+            except OSError:
+                continue  # Subpasta sem permissão - seguir com as demais
+            batch.extend(pdfs)
+            if should_descend(depth):
+                pending_dirs.extend((subdir, depth + 1) for subdir in subdirs)
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-scan") as executor:
+            running = {executor.submit(_scan_directory, subdir): depth for subdir, depth in pending_dirs}
+            try:
+                while running:
+                    ready = take_ready()
+                    while ready:
+                        yield ready
+                        if limit_reached() or cancelled():
+                            return
+                        ready = take_ready()
+                    if cancelled():
+                        return
+                    finished, _ = wait(running, timeout=FLUSH_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        depth = running.pop(future)
+                        try:
+                            pdfs, subdirs = future.result()
+                        except OSError:
+                            continue
+                        batch.extend(pdfs)
+                        if should_descend(depth):
+                            for subdir in subdirs:
+                                running[executor.submit(_scan_directory, subdir)] = depth + 1
+            finally:
+                # Cancelar pastas ainda na fila ao parar antes do fim
+                for future in running:
+                    future.cancel()
+
+    if cancelled():
+        return
+    ready = take_ready(force=True)
+    while ready:
+        yield ready
+        if limit_reached() or cancelled():
+            return
+        ready = take_ready(force=True)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+PDF Tree Merge
+==============
+Hierarchical merge strategy for very large file counts.
+
+Inputs are split into chunks of `chunk_size` files. Worker processes merge
+the chunks into intermediate PDFs in parallel, and the intermediates are
+merged the same way, level by level, until at most `chunk_size` files
+remain for the final pass. Every writer therefore only ever handles
+`chunk_size` inputs, and the parsing/copying work of a level is spread
+across all cores instead of one thread.
+
+Intermediates are plain copies (profile "fast") in a temporary folder next
+to the output; the requested profile is applied in the final pass.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import os
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from pdf_merge_engine import (
+    DEFAULT_OUTPUT_PROFILE,
+    DEFAULT_PARSE_WORKERS,
+    MergeCancelled,
+    PageRanges,
+    PDFMergeError,
+    ProgressCallback,
+    empty_merge_error,
+    get_peak_memory_mb,
+    merge_pdfs_streaming,
+)
+
+DEFAULT_TREE_CHUNK_SIZE = 250
+INTERMEDIATE_PROFILE = "fast"
+CANCEL_POLL_INTERVAL = 0.2
+
+
+def _chunk_ranges(page_ranges: Optional[PageRanges], chunk: List[str]) -> Optional[PageRanges]:
+    """The page ranges of one chunk's inputs (only those are sent to the worker)."""
+    if not page_ranges:
+        return None
+    return {path: page_ranges[path] for path in chunk if path in page_ranges}
+
+
+def _merge_chunk(pdf_paths: List[str], output_path: str, deduplicate: bool,
+                 image_settings: Optional[Tuple[int, int]], skip_errors: bool,
+                 page_ranges: Optional[PageRanges]) -> Dict[str, object]:
+    """
+    Merge one chunk into an intermediate (runs inside a worker process).
+
+    Returns:
+        The merge statistics; an all-skipped chunk returns pages = 0 and no
+        output instead of raising
+    """
+    image_optimizer = None
+    if image_settings is not None:
+        from pdf_image_optimizer import ImageOptimizer
+        # O nível já roda um processo por núcleo; otimizar as imagens no próprio processo
+        image_optimizer = ImageOptimizer(target_dpi=image_settings[0], jpeg_quality=image_settings[1],
+                                         workers=0)
+    try:
+        return merge_pdfs_streaming(pdf_paths, output_path, parse_workers=0, deduplicate=deduplicate,
+                                    profile=INTERMEDIATE_PROFILE, image_optimizer=image_optimizer,
+                                    skip_errors=skip_errors, page_ranges=page_ranges)
+    except PDFMergeError as e:
+        if not e.skipped:
+            raise
+        return {"files": 0, "pages": 0, "dedup_objects": 0, "dedup_bytes_saved": 0,
+                "image_bytes_saved": 0, "skipped": e.skipped}
+
+
+def merge_pdfs_tree(
+    pdf_paths: List[str],
+    output_path: str,
+    progress_callback: Optional[ProgressCallback] = None,
+    chunk_size: int = DEFAULT_TREE_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    deduplicate: bool = True,
+    profile: str = DEFAULT_OUTPUT_PROFILE,
+    image_optimizer=None,
+    cancel_event: Optional[threading.Event] = None,
+    fsync: bool = False,
+    skip_errors: bool = False,
+    page_ranges: Optional[PageRanges] = None,
+) -> Dict[str, object]:
+    """
+    Merge PDFs through parallel levels of intermediate merges.
+
+    With chunk_size or fewer inputs this is a plain merge_pdfs_streaming().
+
+    Args:
+        pdf_paths: Ordered list of input PDF paths
+        output_path: Path of the merged PDF
+        progress_callback: Optional callable(current, total, message, pages_done, bytes_read)
+        chunk_size: Files merged per intermediate (and per writer)
+        workers: Worker processes per level (default: number of cores)
+        parse_workers: Parsing threads of the final pass
+        deduplicate: Write identical streams only once
+        profile: Output profile of the final output
+        image_optimizer: Optional ImageOptimizer; its target DPI and quality
+            are applied inside the workers of the first level
+        cancel_event: Optional threading.Event; checked between chunks
+            (chunks already running finish first)
+        fsync: Flush the final output to disk before it replaces output_path
+        skip_errors: Skip unreadable inputs (reported in 'skipped')
+        page_ranges: Optional {pdf_path: range} such as "1-3,7,10-", applied
+            in the first level
+
+    Returns:
+        Dict with the merge_pdfs_streaming statistics of the final pass, with
+        files, skipped, dedup and image totals summed over all levels, plus
+        levels (number of intermediate levels)
+
+    Raises:
+        PDFMergeError: If an input cannot be read (with skip_errors, only
+            when no input could be merged) or no page is selected at all
+        MergeCancelled: If cancel_event is set before the merge finished
+    """
+    chunk_size = max(2, chunk_size)
+    total = len(pdf_paths)
+    if total <= chunk_size:
+        return merge_pdfs_streaming(pdf_paths, output_path, progress_callback=progress_callback,
+                                    parse_workers=parse_workers, deduplicate=deduplicate,
+                                    profile=profile, image_optimizer=image_optimizer,
+                                    cancel_event=cancel_event, fsync=fsync, skip_errors=skip_errors,
+                                    page_ranges=page_ranges)
+
+    image_settings = None
+    if image_optimizer is not None:
+        image_settings = (image_optimizer.target_dpi, image_optimizer.jpeg_quality)
+
+    skipped: List[Dict[str, object]] = []
+    dedup_objects = dedup_bytes_saved = image_bytes_saved = 0
+    levels = 0
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+
+    with tempfile.TemporaryDirectory(prefix=".pdf_tree_", dir=output_dir) as work_dir, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        level_inputs = list(pdf_paths)
+        while len(level_inputs) > chunk_size:
+            levels += 1
+            chunks = [level_inputs[i:i + chunk_size] for i in range(0, len(level_inputs), chunk_size)]
+            outputs = [os.path.join(work_dir, f"level{levels}_{n:05d}.pdf") for n in range(len(chunks))]
+            first_level = levels == 1
+
+            running = {
+                executor.submit(_merge_chunk, chunk, chunk_output, deduplicate,
+                                image_settings if first_level else None,
+                                skip_errors and first_level,
+                                _chunk_ranges(page_ranges, chunk) if first_level else None): n
+                for n, (chunk, chunk_output) in enumerate(zip(chunks, outputs))
+            }
+            results: Dict[int, Dict[str, object]] = {}
+            try:
+                while running:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise MergeCancelled("Junção cancelada")
+                    finished, _ = wait(running, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        n = running.pop(future)
+                        try:
+                            results[n] = future.result()
+                        except PDFMergeError:
+                            raise
+                        except Exception as e:
+                            raise PDFMergeError(outputs[n], e) from e
+                    if progress_callback and first_level:
+                        done_files = sum(len(chunks[n]) for n in results)
+                        progress_callback(done_files, total, f"Juntando partes ({len(results)}/{len(chunks)})...",
+                                          sum(r["pages"] for r in results.values()), 0)
+            finally:
+                for future in running:
+                    future.cancel()
+
+            for n in range(len(chunks)):
+                stats = results[n]
+                skipped.extend(stats["skipped"])
+                dedup_objects += stats["dedup_objects"]
+                dedup_bytes_saved += stats["dedup_bytes_saved"]
+                image_bytes_saved += stats["image_bytes_saved"]
+            # Partes em que nenhum PDF pôde ser lido não geram intermediário
+            level_inputs = [outputs[n] for n in range(len(chunks)) if results[n]["pages"]]
+
+        if not level_inputs:
+            raise empty_merge_error(skipped, pdf_paths[0])
+
+        def final_progress(current, _total, message, pages_done, bytes_read):
+            if progress_callback:
+                progress_callback(total, total, message, pages_done, bytes_read)
+
+        stats = merge_pdfs_streaming(level_inputs, output_path, progress_callback=final_progress,
+                                     parse_workers=parse_workers, deduplicate=deduplicate,
+                                     profile=profile, cancel_event=cancel_event, fsync=fsync)
+
+    stats.update({
+        "files": total - len(skipped),
+        "skipped": skipped,
+        "levels": levels,
+        "dedup_objects": stats["dedup_objects"] + dedup_objects,
+        "dedup_bytes_saved": stats["dedup_bytes_saved"] + dedup_bytes_saved,
+        "image_bytes_saved": image_bytes_saved,
+        "peak_memory_mb": get_peak_memory_mb(),
+    })
+    return stats
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+PDF Validation Cache
+====================
+Persistent cache of PDF validation results for the SpeedConnect PDF Merger.
+
+Entries are keyed by path, size and modification time (plus an optional
+content hash), so re-adding a file that has not changed costs one stat()
+and one indexed lookup instead of a full parse.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Optional, Tuple
+
+ValidationResult = Tuple[bool, str, int]
+CacheKey = Tuple[int, int, Optional[str]]
+
+
+class PDFValidationCache:
+    """SQLite-backed LRU cache of (is_valid, error_message, page_count)."""
+
+    DEFAULT_MAX_ENTRIES = 20000
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, db_path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 use_content_hash: bool = False):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path of the SQLite file
+            max_entries: Maximum number of entries kept before LRU eviction
+            use_content_hash: Also compare a BLAKE2 hash of the file contents
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.use_content_hash = use_content_hash
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS pdf_cache (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT,
+                is_valid INTEGER NOT NULL,
+                page_count INTEGER NOT NULL,
+                error TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pdf_cache_last_used ON pdf_cache (last_used)"
+        )
+        self.connection.commit()
+
+    def make_key(self, pdf_path: str) -> CacheKey:
+        """
+        Build the cache key of a file from its current state on disk.
+
+        Raises:
+            OSError: If the file cannot be stat'ed (or read, with content hash)
+        """
+        st = os.stat(pdf_path)
+        content_hash = self._hash_file(pdf_path) if self.use_content_hash else None
+        return st.st_size, st.st_mtime_ns, content_hash
+
+    def _hash_file(self, pdf_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, pdf_path: str, key: CacheKey) -> Optional[ValidationResult]:
+        """
+        Look up a cached result.
+
+        Args:
+            pdf_path: Path to the PDF file
+            key: Key returned by make_key()
+
+        Returns:
+            The cached (is_valid, error_message, page_count), or None on a miss
+        """
+        size, mtime_ns, content_hash = key
+        row = self.connection.execute(
+            "SELECT is_valid, error, page_count, content_hash FROM pdf_cache "
+            "WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (pdf_path, size, mtime_ns)
+        ).fetchone()
+        if row is None:
+            return None
+        if content_hash is not None and row[3] != content_hash:
+            return None
+
+        self.connection.execute(
+            "UPDATE pdf_cache SET last_used = ? WHERE path = ?", (time.time(), pdf_path)
+        )
+        return bool(row[0]), row[1], row[2]
+
+    def put(self, pdf_path: str, key: CacheKey, result: ValidationResult) -> None:
+        """
+        Store a validation result.
+
+        Args:
+            pdf_path: Path to the PDF file
+            key: Key computed before the file was validated
+            result: Tuple of (is_valid, error_message, page_count)
+        """
+        size, mtime_ns, content_hash = key
+        is_valid, error_msg, page_count = result
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pdf_cache "
+            "(path, size, mtime_ns, content_hash, is_valid, page_count, error, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (pdf_path, size, mtime_ns, content_hash, int(is_valid), page_count, error_msg, time.time())
+        )
+
+    def _evict(self) -> None:
+        count = self.connection.execute("SELECT COUNT(*) FROM pdf_cache").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            # Remover os menos usados recentemente
+            self.connection.execute(
+                "DELETE FROM pdf_cache WHERE path IN "
+                "(SELECT path FROM pdf_cache ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def flush(self) -> None:
+        """Apply the size cap and commit pending changes to disk."""
+        self._evict()
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Flush and close the database."""
+        try:
+            self.flush()
+        finally:
+            self.connection.close()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+PDF Folder Watcher
+==================
+Watch-folder mode for the SpeedConnect merge engine.
+
+Scanners drop files into a shared folder; the watcher waits until the
+new PDFs have stopped changing, merges them into a timestamped output and
+records them in a small SQLite state store, so a restart only picks up
+files that arrived (or changed) since the last merge.
+
+On Linux the folder is watched with inotify (through ctypes, no extra
+dependency); elsewhere, or when inotify is unavailable, the folder is
+polled. Either way, events only wake the watcher up: the list of pending
+files always comes from a fresh scan, so a missed event costs at most one
+poll interval.
+
+Author: SpeedConnect Team
+Version: 2.3
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pdf_batch import MERGE_FUNCTIONS
+from pdf_merge_engine import DEFAULT_OUTPUT_PROFILE, MergeCancelled, PDFMergeError, find_pdf_files
+
+DEFAULT_SETTLE_SECONDS = 5.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Máscara inotify: arquivo fechado após escrita, movido para a pasta, criado ou removido
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+FileSignature = Tuple[int, int]  # (tamanho, mtime_ns)
+# callback(evento, dados): "merged" (stats), "error" (mensagem) ou "pending" (nº de arquivos)
+WatchCallback = Callable[[str, object], None]
+
+
+class WatchState:
+    """SQLite store of the files a watcher has already handled."""
+
+    def __init__(self, db_path: str):
+        """
+        Open (or create) the state database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        # O watcher roda numa thread própria; a conexão é usada só por ela
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute(
+            """CREATE TABLE IF NOT EXISTS processed_files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                output TEXT NOT NULL,
+                processed_at REAL NOT NULL
+            )"""
+        )
+        self.connection.commit()
+
+    def is_processed(self, path: str, signature: FileSignature) -> bool:
+        """Whether this exact version of path was already merged (or rejected)."""
+        row = self.connection.execute(
+            "SELECT 1 FROM processed_files WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, signature[0], signature[1])
+        ).fetchone()
+        return row is not None
+
+    def mark(self, entries: List[Tuple[str, FileSignature]], status: str, output: str) -> None:
+        """
+        Record files as handled.
+
+        Args:
+            entries: (path, signature) of each file
+            status: 'merged', 'error' or 'output'
+            output: Output the files went into (empty for errors)
+        """
+        now = time.time()
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO processed_files "
+            "(path, size, mtime_ns, status, output, processed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(path, size, mtime_ns, status, output, now) for path, (size, mtime_ns) in entries]
+        )
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+
+class _InotifyWaiter:
+    """Block until the watched folder changes, using Linux inotify via ctypes."""
+
+    def __init__(self, directory: str):
+        """
+        Raises:
+            OSError: If inotify is not available on this system
+        """
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc não encontrada")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify indisponível")
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch falhou para {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Wait for folder events.
+
+        Returns:
+            True if at least one event arrived before the timeout
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        # Os eventos só acordam o watcher; o conteúdo é descartado
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _PollingWaiter:
+    """Fallback waiter: sleep one poll interval (interruptible by stop())."""
+
+    def __init__(self, stop_event: threading.Event):
+        self.stop_event = stop_event
+
+    def wait(self, timeout: float) -> bool:
+        self.stop_event.wait(timeout)
+        return False
+
+    def close(self) -> None:
+        pass
+
+
+class FolderWatcher:
+    """
+    Merge new PDFs dropped into a folder once they stop changing.
+
+    A file is ready when its size and modification time have not changed
+    for `settle_seconds`. New files are grouped: the watcher merges only
+    when every pending file is ready, so a scanner writing a batch of
+    pages produces one output instead of one per file.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        output_dir: str,
+        state_path: str,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        mode: str = "streaming",
+        profile: str = DEFAULT_OUTPUT_PROFILE,
+        output_prefix: str = "merge",
+        use_inotify: bool = True,
+        fsync: bool = False,
+        callback: Optional[WatchCallback] = None,
+    ):
+        """
+        Args:
+            directory: Folder to watch (top level only)
+            output_dir: Folder receiving the merged PDFs (may be directory)
+            state_path: SQLite file remembering handled files
+            settle_seconds: Time a file must stay unchanged before merging
+            poll_interval: Rescan interval without inotify (and safety net with it)
+            mode: Engine mode, 'streaming' or 'memory'
+            profile: Output profile name from OUTPUT_PROFILES
+            output_prefix: Output names are <prefix>_YYYYmmdd_HHMMSS.pdf
+            use_inotify: Try inotify before falling back to polling
+            fsync: Flush each output to disk before it appears in output_dir
+            callback: Optional callable(event, data), called from the watcher thread
+        """
+        self.directory = os.path.abspath(directory)
+        self.output_dir = os.path.abspath(output_dir)
+        self.state_path = state_path
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.mode = mode
+        self.profile = profile
+        self.output_prefix = output_prefix
+        self.use_inotify = use_inotify
+        self.fsync = fsync
+        self.callback = callback
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # caminho -> (assinatura, instante da última mudança)
+        self._pending: Dict[str, Tuple[FileSignature, float]] = {}
+
+    def start(self) -> None:
+        """Run the watcher in a background thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, name="pdf-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Ask the watcher to stop and wait for its thread (a running merge is cancelled)."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run(self) -> None:
+        """
+        Watch until stop() is called (blocks the calling thread).
+
+        Raises:
+            NotADirectoryError: If the watched folder does not exist
+        """
+        if not os.path.isdir(self.directory):
+            raise NotADirectoryError(f"Diretório não existe ou não é válido: {self.directory}")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        waiter = None
+        if self.use_inotify:
+            try:
+                waiter = _InotifyWaiter(self.directory)
+            except (OSError, AttributeError):
+                waiter = None  # Outro sistema ou limite de watches atingido - usar polling
+        if waiter is None:
+            waiter = _PollingWaiter(self._stop_event)
+
+        state = WatchState(self.state_path)
+        try:
+            while not self._stop_event.is_set():
+                ready = self.check_once(state)
+                if ready:
+                    self.merge_ready(state, ready)
+                    continue
+                # Com arquivos pendentes, acordar a tempo de confirmar a estabilidade
+                timeout = self.poll_interval
+                if self._pending:
+                    timeout = min(timeout, self.settle_seconds)
+                waiter.wait(timeout)
+        finally:
+            waiter.close()
+            state.close()
+
+    def check_once(self, state: WatchState) -> List[Tuple[str, FileSignature]]:
+        """
+        Rescan the folder and update the pending files.
+
+        Returns:
+            The pending files, in name order, if all of them are stable;
+            otherwise an empty list
+        """
+        now = time.monotonic()
+        try:
+            paths = find_pdf_files(self.directory)
+        except OSError as e:
+            self._notify("error", f"Erro ao listar {self.directory}: {e}")
+            return []
+
+        current = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # Removido entre a listagem e o stat
+            signature = (st.st_size, st.st_mtime_ns)
+            if state.is_processed(path, signature):
+                continue
+            previous = self._pending.get(path)
+            if previous is not None and previous[0] == signature:
+                current[path] = previous
+            else:
+                current[path] = (signature, now)
+
+        if current.keys() != self._pending.keys():
+            self._notify("pending", len(current))
+        self._pending = current
+
+        if not current:
+            return []
+        if any(now - changed_at < self.settle_seconds for _, changed_at in current.values()):
+            return []
+        return [(path, current[path][0]) for path in sorted(current)]
+
+    def merge_ready(self, state: WatchState, ready: List[Tuple[str, FileSignature]]) -> None:
+        """Merge stable files and record the outcome in the state store."""
+        output_path = self._next_output_path()
+        paths = [path for path, _ in ready]
+        try:
+            # Um arquivo estável ainda pode ser regravado: sem mmap, truncá-lo vira erro e não SIGBUS
+            stats = MERGE_FUNCTIONS[self.mode](paths, output_path, profile=self.profile,
+                                               cancel_event=self._stop_event, fsync=self.fsync,
+                                               skip_errors=True, buffered=True)
+        except MergeCancelled:
+            return  # Nada foi marcado: os arquivos são juntados na próxima execução
+        except PDFMergeError as e:
+            # Nenhum dos arquivos pôde ser lido
+            state.mark(ready, "error", "")
+            for entry in e.skipped:
+                self._notify("error", f"Ignorado '{os.path.basename(entry['path'])}': {entry['reason']}")
+            self._pending = {}
+            return
+        except OSError as e:
+            self._notify("error", f"Erro ao gravar {output_path}: {e}")
+            self._stop_event.wait(self.poll_interval)
+            return
+
+        # PDFs inválidos ficam registrados como erro e não são tentados de novo
+        bad_paths = {entry["path"] for entry in stats["skipped"]}
+        for entry in stats["skipped"]:
+            self._notify("error", f"Ignorado '{os.path.basename(entry['path'])}': {entry['reason']}")
+        state.mark([item for item in ready if item[0] in bad_paths], "error", "")
+        state.mark([item for item in ready if item[0] not in bad_paths], "merged", output_path)
+        # A própria saída não deve ser juntada de novo se estiver na pasta monitorada
+        try:
+            st = os.stat(output_path)
+            state.mark([(output_path, (st.st_size, st.st_mtime_ns))], "output", output_path)
+        except OSError:
+            pass
+        self._pending = {}
+        stats["output"] = output_path
+        self._notify("merged", stats)
+
+    def _next_output_path(self) -> str:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = os.path.join(self.output_dir, f"{self.output_prefix}_{stamp}.pdf")
+        counter = 2
+        while os.path.exists(output_path):
+            output_path = os.path.join(self.output_dir, f"{self.output_prefix}_{stamp}_{counter}.pdf")
+            counter += 1
+        return output_path
+
+    def _notify(self, event: str, data: object) -> None:
+        if self.callback:
+            self.callback(event, data)